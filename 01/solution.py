@@ -3,11 +3,19 @@ import sys
 
 sys.path.append("..")
 
+from utils.matcher import AhoCorasick
+from utils.parallel import map_reduce
+from utils.reader import MappedInput
 
 # fmt: on
 
 NUMBERS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
-R_NUMBERS = list(map(lambda n: ''.join(reversed(n)), NUMBERS))
+
+# digits and number words, overlaps like "twone" are found by the automaton
+DIGITS = AhoCorasick({
+    **{str(k): k for k in range(10)},
+    **{n: k for k, n in enumerate(NUMBERS, 1)},
+})
 
 def part_1(data):
 
@@ -27,27 +35,12 @@ def part_1(data):
     return sum
 
 def first_number(l):
-    for i in range(len(l)):
-        s = l[i]
-        if s.isnumeric():
-            return s
-        else:
-            for k, n in enumerate(NUMBERS, 1):
-                if l[i:].startswith(n):
-                    return str(k)
-
-    return None
+    first = DIGITS.first(l)
+    return None if first is None else str(first)
 
 def last_number(l):
-    lr = "".join(reversed(l))
-    for i in range(len(lr)):
-        s = lr[i]
-        if s.isnumeric():
-            return s
-        else:
-            for k, n in enumerate(R_NUMBERS, 1):
-                if lr[i:].startswith(n):
-                    return str(k)
+    last = DIGITS.last(l)
+    return None if last is None else str(last)
 
 def part_2(data):
     # sumitted
@@ -65,24 +58,55 @@ def part_2(data):
     # return sum
 
     # refactored with new idea
+    # sum = 0
+    # for l in data:
+    #
+    #     for i, n in enumerate(NUMBERS, 1):
+    #         l = l.replace(n, n[0] + str(i) + n[-1])
+    #
+    #     for s in l:
+    #         if s.isnumeric():
+    #             first = s
+    #             break
+    #     for s in reversed(l):
+    #         if s.isnumeric():
+    #             last = s
+    #             break
+    #
+    #     sum += int(first + last)
+    #
+    # return sum
+
+    # single pass over each line with a multi pattern matcher
     sum = 0
     for l in data:
+        first, last = DIGITS.first_last(l)
+        sum += first * 10 + last
 
-        for i, n in enumerate(NUMBERS, 1):
-            l = l.replace(n, n[0] + str(i) + n[-1])
+    return sum
 
-        for s in l:
-            if s.isnumeric():
-                first = s
-                break
-        for s in reversed(l):
-            if s.isnumeric():
-                last = s
-                break
 
-        sum += int(first + last)
+def _part_1_chunk(chunk):
+    return part_1(chunk.owned)
 
-    return sum
+
+def _part_2_chunk(chunk):
+    return part_2(chunk.owned)
+
+
+def part_1_parallel(data, processes=None):
+    """part_1 on chunks of lines across a process pool, lines are independent"""
+    return map_reduce(_part_1_chunk, data, processes=processes)
+
+
+def part_2_parallel(data, processes=None):
+    """part_2 on chunks of lines across a process pool, lines are independent"""
+    return map_reduce(_part_2_chunk, data, processes=processes)
+
+
+def part_2_buffer(text):
+    """part_2 for a whole file buffer, scanned in a single pass"""
+    return sum(first * 10 + last for first, last in DIGITS.lines(text))
 
 
 def parse(lines):
@@ -91,9 +115,10 @@ def parse(lines):
 
 
 def main(puzzle_input_f):
-    lines = [l.strip() for l in puzzle_input_f.readlines() if l]
-    print("Part 1: ", part_1(parse(lines[:])))
-    print("Part 2: ", part_2(parse(lines[:])))
+    # lines are read lazily from the memory mapped file
+    with MappedInput(puzzle_input_f) as puzzle:
+        print("Part 1: ", part_1(parse(puzzle.lines())))
+        print("Part 2: ", part_2(parse(puzzle.lines())))
 
 
 if __name__ == "__main__":
@@ -34,4 +34,22 @@ def test_part_2(file: Path, expected):
 
 def test_parse_line():
 
-    assert solution.parse_line("abcone2threexyz") == "abc123xyz"
\ No newline at end of file
+    assert solution.parse_line("abcone2threexyz") == "abc123xyz"
+
+
+@pytest.mark.parametrize("line,first,last", [("twone", "2", "1"), ("eightwothree", "8", "3"), ("7pqrstsixteen", "7", "6")])
+def test_first_last_number_overlapping(line, first, last):
+    assert solution.first_number(line) == first
+    assert solution.last_number(line) == last
+
+
+def test_part_2_buffer():
+    text = Path("test_input.txt").read_text()
+
+    assert solution.part_2_buffer(text) == 281
+
+
+def test_parallel():
+    lines = Path("test_input.txt").read_text().splitlines()
+
+    assert solution.part_2_parallel(lines, processes=2) == solution.part_2(lines) == 281
@@ -1,84 +1,335 @@
 # fmt: off
+import re
 import sys
-from collections import defaultdict
-from itertools import product
+from dataclasses import dataclass
 from math import prod
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 sys.path.append("..")
 
+from utils.parallel import map_reduce
+from utils.reader import MappedInput
+
 
 # fmt: on
 
-def part_1(data):
-    available_cubes = {
-        "red": 12,
-        "green": 13,
-        "blue": 14
-    }
+COLORS = ("red", "green", "blue")  # known colors come first, others follow in order of appearance
+
+_COLON = ord(":")
+_SEMICOLON = ord(";")
+_WORD = re.compile(rb"[a-z]+")
+
+_FAST_DIGITS = 9
+"""Numbers up to this many digits are converted with NumPy, longer ones one by one with int()"""
+
+_WORD_BYTES = 8
+"""Color words up to this many letters are interned as one uint64, longer ones one by one"""
+
+
+@dataclass
+class Draws:
+    """Flat per draw data, one row per draw in input order"""
+    game: np.ndarray  # index of the game the draw belongs to
+    counts: np.ndarray  # draws x colors
+
+
+@dataclass
+class Games:
+    """
+    Game records as structure of arrays, one row per game in input order.
+
+    Build by a single vectorized scan over the raw bytes of the input.
+    """
+    ids: np.ndarray
+    maxima: np.ndarray  # games x colors, maximum amount shown at once, 0 if never shown
+    colors: Tuple[str, ...] = COLORS
+    draws: Optional[Draws] = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def color(self, name: str) -> np.ndarray:
+        """Maxima of a single color, 0 for colors which never appear"""
+        if name not in self.colors:
+            return np.zeros(len(self.ids), dtype=np.int64)
+        return self.maxima[:, self.colors.index(name)]
+
+    @property
+    def red(self):
+        return self.color("red")
+
+    @property
+    def green(self):
+        return self.color("green")
+
+    @property
+    def blue(self):
+        return self.color("blue")
+
+    @staticmethod
+    def from_lines(lines, draws=False) -> "Games":
+        return Games.from_buffer("\n".join(lines).encode(), draws)
+
+    @staticmethod
+    def from_buffer(buffer, draws=False) -> "Games":
+        """
+        Parses game records from a bytes like object (e.g. `MappedInput.buffer`).
+
+        :param draws: also collect the amounts of every single draw
+        """
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        starts, ends, values = _numbers(data, buffer)
+        last = len(data) - 1
+
+        # "Game 1:" ids are followed by a colon, amounts by a space and the color
+        is_game = data[np.minimum(ends, last)] == _COLON
+        if len(is_game) and not is_game[0]:
+            raise ValueError("Expected a game before the first amount")
+        ids = values[is_game]
+        game_of = np.cumsum(is_game) - 1
+
+        cubes = np.flatnonzero(~is_game)
+        color_of, colors = _colors(data, buffer, ends[cubes] + 1)
+
+        maxima = np.zeros((len(ids), len(colors)), dtype=np.int64)
+        np.maximum.at(maxima.reshape(-1), game_of[cubes] * len(colors) + color_of, values[cubes])
+
+        result = Games(ids, maxima, colors)
+        if draws:
+            # a draw starts with each game and after each semicolon
+            game_starts = starts[is_game]
+            events = np.sort(np.concatenate([game_starts, np.flatnonzero(data == _SEMICOLON)]))
+            draw_of = np.searchsorted(events, starts[cubes], side="right") - 1
+
+            counts = np.zeros((len(events), len(colors)), dtype=np.int64)
+            np.add.at(counts.reshape(-1), draw_of * len(colors) + color_of, values[cubes])
+
+            result.draws = Draws(np.searchsorted(game_starts, events, side="right") - 1, counts)
+
+        return result
+
+    def limits(self, available_cubes: Dict[str, int]) -> np.ndarray:
+        """Available cubes as vector in color order, colors which are not available are 0"""
+        return np.array([available_cubes.get(color, 0) for color in self.colors], dtype=np.int64)
 
-    result = 0
+    def possible(self, available_cubes: Dict[str, int]) -> np.ndarray:
+        """Mask of games, which are possible with the available cubes"""
+        return np.all(self.maxima <= self.limits(available_cubes), axis=1)
 
-    for line in data:
-        possible = True
+    def power(self) -> np.ndarray:
+        """Product of the minimal required cubes per game, colors never shown are skipped"""
+        return np.where(self.maxima == 0, 1, self.maxima).prod(axis=1)
 
-        # Game 1: 7 blue, 4 red, 11 green; 2 red, 2 blue, 7 green; 2 red, 13 blue, 8 green; 18 blue, 7 green, 5 red
-        game, line = line.split(":")
-        game = int(game[5:])
 
-        sets = line.split(";")
-        for s in sets:
-            cubes: list[str] = s.split(",")
+class GameIndex:
+    """
+    Answers many "sum of ids of possible games" questions for different bags.
 
-            for cube in cubes:
-                amount, color = cube.strip().split(" ")
-                if available_cubes[color] < int(amount):
-                    possible = False
+    Games are grouped by their maxima vector, ranked per color, into a table with cumulative sums along every color.
+    The sum for a bag is a single lookup of the cell, which dominates all games within the bag.
+    If the table would exceed `max_cells`, games are sorted by their first color instead,
+    so a query only checks the games with a small enough first color.
 
-        if possible:
-            result += game
+    The table holds 8 bytes per cell, by default it may have `CELLS_PER_GAME` cells per game,
+    but at least `MIN_CELLS` (512 KB), so it stays in proportion to the games it indexes.
+    """
 
-    return result
+    CELLS_PER_GAME = 16
+    MIN_CELLS = 1 << 16
 
+    def __init__(self, games: Games, max_cells: Optional[int] = None):
+        if max_cells is None:
+            max_cells = max(self.MIN_CELLS, self.CELLS_PER_GAME * len(games))
 
-def part_2(data):
+        self.colors = games.colors
+        self.levels = [np.unique(games.maxima[:, c]) for c in range(len(self.colors))]
+        self.table = None
+
+        shape = tuple(len(levels) for levels in self.levels)
+        if self.colors and prod(shape) <= max_cells:
+            ranks = tuple(np.searchsorted(levels, games.maxima[:, c]) for c, levels in enumerate(self.levels))
+            table = np.zeros(shape, dtype=np.int64)
+            np.add.at(table, ranks, games.ids)
+            for axis in range(table.ndim):
+                np.cumsum(table, axis=axis, out=table)
+            self.table = table
+        else:
+            order = np.argsort(games.maxima[:, 0], kind="stable") if self.colors else slice(None)
+            self.maxima = games.maxima[order]
+            self.ids = games.ids[order]
+
+    def limits(self, queries: Union[np.ndarray, Iterable[Dict[str, int]]]) -> np.ndarray:
+        """Queries as matrix (queries x colors), bags given as dict may contain unknown colors"""
+        if isinstance(queries, np.ndarray):
+            return np.atleast_2d(queries).astype(np.int64)
+
+        queries = list(queries)
+        limits = np.zeros((len(queries), len(self.colors)), dtype=np.int64)
+        for q, bag in enumerate(queries):
+            limits[q] = [bag.get(color, 0) for color in self.colors]
+        return limits
+
+    def query(self, available_cubes: Dict[str, int]) -> int:
+        return int(self.batch([available_cubes])[0])
+
+    def batch(self, queries: Union[np.ndarray, Iterable[Dict[str, int]]]) -> np.ndarray:
+        """
+        Sum of ids of the possible games for every query.
+
+        :param queries: bags as dicts color -> amount, or as matrix with columns in `colors` order
+        """
+        limits = self.limits(queries)
+        if not self.colors:
+            # without colors every game is possible
+            return np.full(len(limits), self._total(), dtype=np.int64)
+
+        if self.table is None:
+            return self._scan(limits)
+
+        # highest rank within the bag per color, -1 if even the lowest level does not fit
+        ranks = np.stack([
+            np.searchsorted(levels, limits[:, c], side="right") - 1
+            for c, levels in enumerate(self.levels)
+        ])
+        result = np.zeros(len(limits), dtype=np.int64)
+        fits = np.all(ranks >= 0, axis=0)
+        result[fits] = self.table[tuple(ranks[:, fits])]
+        return result
+
+    def _total(self) -> int:
+        if self.table is not None:
+            return int(self.table.reshape(-1)[-1]) if self.table.size else 0
+        return int(self.ids.sum())
+
+    def _scan(self, limits: np.ndarray) -> np.ndarray:
+        first = np.searchsorted(self.maxima[:, 0], limits[:, 0], side="right")
+        result = np.zeros(len(limits), dtype=np.int64)
+        for q, (end, limit) in enumerate(zip(first, limits)):
+            possible = np.all(self.maxima[:end] <= limit, axis=1)
+            result[q] = self.ids[:end][possible].sum()
+        return result
+
+
+def _numbers(data: np.ndarray, buffer):
+    """Start, end (exclusive) and value of every digit run"""
+    digit = np.empty(len(data) + 2, dtype=bool)
+    digit[0] = digit[-1] = False
+    np.less(data - ord("0"), 10, out=digit[1:-1])  # wraps around for bytes below "0"
+
+    edges = np.flatnonzero(digit[1:] != digit[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    lengths = ends - starts
+
+    # cube amounts are short, so the few longer runs (game ids) are finished on their own
+    values = (data[ends - 1] - ord("0")).astype(np.int64)
+    values += np.where(lengths > 1, (data[ends - 2] - ord("0")).astype(np.int64) * 10, 0)
+
+    long = np.flatnonzero(lengths > 2)
+    scale = 100
+    for k in range(2, min(_FAST_DIGITS, int(lengths.max(initial=0)))):
+        long = long[lengths[long] > k]
+        values[long] += (data[ends[long] - 1 - k] - ord("0")).astype(np.int64) * scale
+        scale *= 10
+
+    # numbers too long for the digit passes
+    for i in np.flatnonzero(lengths > _FAST_DIGITS):
+        values[i] = int(buffer[starts[i]:ends[i]])
+
+    return starts, ends, values
+
+
+def _colors(data: np.ndarray, buffer, positions: np.ndarray) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Color index of the words starting at the positions, and the color names.
+
+    Words are runs of lower case letters. Only the distinct words are interned: words up to `_WORD_BYTES` letters
+    by `np.unique` over fixed width slices, longer words one by one with a regex.
+    """
+    # fixed width slices, one byte longer than a short word to tell whether it ends within the slice
+    padded = np.zeros(len(data) + _WORD_BYTES + 1, dtype=np.uint8)
+    padded[:len(data)] = data
+    slices = sliding_window_view(padded, _WORD_BYTES + 1)[positions]
+
+    # letters up to the first byte which is no letter
+    word = (slices - ord("a")) < 26  # wraps around for bytes below "a"
+    for k in range(1, _WORD_BYTES + 1):
+        word[:, k] &= word[:, k - 1]
+    if not word[:, 0].all():
+        raise ValueError("Expected a color after every amount")
+
+    # short words with the bytes after the word cleared, compared as one uint64
+    keys = np.ascontiguousarray(slices[:, :_WORD_BYTES] * word[:, :_WORD_BYTES]).view("<u8").reshape(-1)
+    long = np.flatnonzero(word[:, _WORD_BYTES])
+    keys[long] = 0  # no word has this key, the smallest one, so it is dropped below
+    distinct, groups = np.unique(keys, return_inverse=True)
+    if len(long):
+        distinct, groups = distinct[1:], groups - 1
+    names = [key.to_bytes(_WORD_BYTES, "little").rstrip(b"\0") for key in distinct.tolist()]
+
+    interned = {}
+    for i in long.tolist():
+        name = _WORD.match(buffer, int(positions[i])).group()
+        groups[i] = interned.setdefault(name, len(names))
+        if groups[i] == len(names):
+            names.append(name)
+
+    # first occurrence of every distinct word
+    first = np.full(len(names), len(positions), dtype=np.int64)
+    np.minimum.at(first, groups, np.arange(len(positions)))
+
+    # known colors first, so columns are stable across inputs, others in order of appearance
+    found = [name.decode() for name in names]
+    others = sorted((f, name) for f, name in zip(first.tolist(), found) if name not in COLORS)
+    colors = tuple([c for c in COLORS if c in found] + [name for _, name in others])
+    remap = np.array([colors.index(name) for name in found], dtype=np.int64)
+    return remap[groups] if found else groups, colors
+
+
+def part_1(games: Games):
     available_cubes = {
         "red": 12,
         "green": 13,
         "blue": 14
     }
 
-    result = 0
+    return int(games.ids[games.possible(available_cubes)].sum())
+
+
+def part_2(games: Games):
+    return int(games.power().sum())
+
 
-    for line in data:
-        required_cubes = defaultdict(int)
+def _part_1_chunk(chunk):
+    return part_1(parse(chunk.owned))
 
-        # Game 1: 7 blue, 4 red, 11 green; 2 red, 2 blue, 7 green; 2 red, 13 blue, 8 green; 18 blue, 7 green, 5 red
-        game, line = line.split(":")
-        game = int(game[5:])
 
-        sets = line.split(";")
-        for s in sets:
-            cubes: list[str] = s.split(",")
+def _part_2_chunk(chunk):
+    return part_2(parse(chunk.owned))
 
-            for cube in cubes:
-                amount, color = cube.strip().split(" ")
 
-                required_cubes[color] = max(required_cubes[color], int(amount))
+def part_1_parallel(data, processes=None):
+    """part_1 on chunks of lines across a process pool, lines are independent"""
+    return map_reduce(_part_1_chunk, data, processes=processes)
 
-        result += prod(required_cubes.values())
 
-    return result
+def part_2_parallel(data, processes=None):
+    """part_2 on chunks of lines across a process pool, lines are independent"""
+    return map_reduce(_part_2_chunk, data, processes=processes)
 
 
 def parse(lines):
-    # lines = [int(l) for l in lines]
-    return lines
+    return Games.from_lines(lines)
 
 
 def main(puzzle_input_f):
-    lines = [l.strip() for l in puzzle_input_f.readlines() if l]
-    print("Part 1: ", part_1(parse(lines[:])))
-    print("Part 2: ", part_2(parse(lines[:])))
+    # one scan over the memory mapped file, both parts use the parsed games
+    with MappedInput(puzzle_input_f) as puzzle:
+        games = Games.from_buffer(puzzle.buffer)
+    print("Part 1: ", part_1(games))
+    print("Part 2: ", part_2(games))
 
 
 if __name__ == "__main__":
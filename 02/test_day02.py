@@ -29,4 +29,73 @@ def test_part_2(file: Path, expected):
     lines = file.read_text().splitlines()
 
     result = solution.part_2(solution.parse(lines))
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+@pytest.mark.parametrize(
+    "file,expected_1,expected_2",
+    [param(Path(file), expected_1, expected_2, id=file) for file, expected_1, expected_2 in files],
+)
+def test_parallel(file: Path, expected_1, expected_2):
+    lines = file.read_text().splitlines()
+
+    assert solution.part_1_parallel(lines, processes=2) == expected_1
+    assert solution.part_2_parallel(lines, processes=2) == expected_2
+
+
+def test_parse_games():
+    lines = Path("test_input.txt").read_text().splitlines()
+
+    games = solution.Games.from_lines(lines, draws=True)
+    assert games.ids.tolist() == [1, 2, 3, 4, 5]
+    assert games.maxima.tolist() == [[4, 2, 6], [1, 3, 4], [20, 13, 6], [14, 3, 15], [6, 3, 2]]
+    assert games.draws.game.tolist() == [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4]
+    assert games.draws.counts[:3].tolist() == [[4, 0, 3], [1, 2, 6], [0, 2, 0]]
+
+
+def test_parse_long_numbers():
+    games = solution.parse(["Game 12345678901234: 1234567890 red, 7 blue", "Game 3: 123456789 green"])
+    assert games.ids.tolist() == [12345678901234, 3]
+    assert games.maxima.tolist() == [[1234567890, 0, 7], [0, 123456789, 0]]
+
+
+def test_parse_long_colors():
+    games = solution.parse(["Game 1: 2 burgundyred, 1 burgundy; 3 red", "Game 2: 5 ultramarine, 4 burgundyred"])
+    assert games.colors == ("red", "burgundyred", "burgundy", "ultramarine")
+    assert games.maxima.tolist() == [[3, 2, 1, 0], [0, 4, 0, 5]]
+
+
+def test_parse_amount_before_game():
+    with pytest.raises(ValueError):
+        solution.parse(["3 blue", "Game 1: 1 red"])
+
+
+def test_game_index():
+    lines = Path("test_input.txt").read_text().splitlines()
+
+    index = solution.GameIndex(solution.parse(lines))
+    assert index.query({"red": 12, "green": 13, "blue": 14}) == 8
+    assert index.batch([{"red": 12, "green": 13, "blue": 14}, {"red": 20, "green": 20, "blue": 20}, {}]).tolist() == [8, 15, 0]
+
+
+def test_game_index_table_size():
+    games = solution.parse([f"Game {i}: {i} red, {i} green, {i} blue" for i in range(1, 101)])
+    bag = {"red": 10, "green": 20, "blue": 30}
+
+    # 100 levels per color need 10^6 cells, more than the default allows for 100 games
+    index = solution.GameIndex(games)
+    assert index.table is None
+    assert index.query(bag) == 55
+
+    index = solution.GameIndex(games, max_cells=100 ** 3)
+    assert index.table.size == 100 ** 3
+    assert index.query(bag) == 55
+
+
+def test_game_index_unknown_colors():
+    lines = ["Game 1: 3 yellow, 2 red; 1 blue", "Game 7: 4 red, 1 yellow", "Game 9: 2 green"]
+
+    games = solution.parse(lines)
+    assert games.colors == ("red", "green", "blue", "yellow")
+    for max_cells in (None, 0):
+        index = solution.GameIndex(games, max_cells=max_cells)
+        assert index.batch([{"red": 4, "yellow": 3}, {"red": 4, "yellow": 3, "blue": 1}, {"green": 2, "pink": 1}]).tolist() == [7, 8, 9]
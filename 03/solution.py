@@ -1,117 +1,261 @@
 # fmt: off
 import re
 import sys
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Dict, Tuple, List
+from array import array
+from collections import deque
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
 sys.path.append("..")
 
+from utils.parallel import map_reduce
+from utils.reader import MappedInput
 
-# fmt: on
-
-@dataclass
-class Number:
-    value: int
-    line: int
-    start: int
-    end: int
 
+# fmt: on
 
-def part_1(data):
+TOKENS = re.compile(r"(\d+)|[^\d.]")
+
+
+class Row(NamedTuple):
+    """Single scanned row, numbers get consecutive ids starting at `first`"""
+    labels: array  # per cell, id of the number covering it, -1 for none
+    first: int
+    values: array
+    starts: array
+    ends: array  # exclusive
+    symbols: List[Tuple[int, str]]  # (x, symbol)
+    mask: int  # symbol bitset, bit x is set for a symbol in column x
+
+
+def scan_row(row: str, first=0, width=None) -> Row:
+    """Labels, numbers and symbols of a row in one regex pass, labels are padded to width"""
+    labels = array("l", [-1]) * max(len(row), width or 0)
+    values, starts, ends = array("q"), array("q"), array("q")
+    symbols = []
+    mask = 0
+
+    for token in TOKENS.finditer(row):
+        start, end = token.span()
+        if token.group(1):
+            labels[start:end] = array("l", [first + len(values)]) * (end - start)
+            values.append(int(token.group(1)))
+            starts.append(start)
+            ends.append(end)
+        else:
+            symbols.append((start, token.group()))
+            mask |= 1 << start
+
+    return Row(labels, first, values, starts, ends, symbols, mask)
+
+
+def dilate(mask: int) -> int:
+    return mask | mask << 1 | mask >> 1
+
+
+def touching(labels: List[Sequence[int]], x: int) -> List[int]:
+    """Distinct ids of the numbers around column x, given the labels of the rows above, at and below (or fewer)"""
+    ids = []
+    for row in labels:
+        for label in row[max(x - 1, 0):x + 2]:
+            if label >= 0 and label not in ids:
+                ids.append(label)
+    return ids
+
+
+class Schematic:
+    """
+    Engine schematic as labelled components.
+
+    Every cell is labelled with the id of the number covering it (-1 for none), values and spans of the numbers
+    are kept in parallel arrays indexed by id. Numbers around a symbol are read from its 8 neighbor labels.
+
+    Symbols are kept as bitset per row (bit x is set for a symbol in column x).
+    Dilated by one cell, the bitsets mark every cell adjacent to a symbol,
+    so a part number is found with a single AND.
+    """
+
+    def __init__(self, width=0):
+        self.width = width
+        self.labels = array("l")  # row major, width cells per row
+        self.values = array("q")
+        self.lines = array("q")
+        self.starts = array("q")
+        self.ends = array("q")  # exclusive
+        self.offsets = array("q", [0])  # first number id per row, plus the total
+        self.symbols: List[List[Tuple[int, str]]] = []  # per row, (x, symbol)
+        self.masks: List[int] = []  # per row, symbol bitset
+        self._adjacent: Optional[List[int]] = None
+
+    @staticmethod
+    def from_lines(lines) -> "Schematic":
+        schematic = Schematic()
+        for row in lines:
+            schematic.add_row(row)
+        return schematic
+
+    def __len__(self):
+        return len(self.masks)
+
+    def add_row(self, row: str):
+        if not self.masks:
+            self.width = max(self.width, len(row))
+        if len(row) > self.width:
+            raise ValueError("Rows have to fit into the width of the schematic")
+
+        scanned = scan_row(row, len(self.values), self.width)
+        self.labels.extend(scanned.labels)
+        self.values.extend(scanned.values)
+        self.lines.extend(array("q", [len(self.masks)]) * len(scanned.values))
+        self.starts.extend(scanned.starts)
+        self.ends.extend(scanned.ends)
+        self.offsets.append(len(self.values))
+        self.symbols.append(scanned.symbols)
+        self.masks.append(scanned.mask)
+        self._adjacent = None
+
+    def label(self, x: int, y: int) -> int:
+        """Id of the number covering the cell, -1 for none"""
+        return self.labels[y * self.width + x]
+
+    def numbers(self, y: int) -> range:
+        """Ids of the numbers on a row"""
+        return range(self.offsets[y], self.offsets[y + 1])
+
+    @property
+    def adjacent(self) -> List[int]:
+        """Per row bitset of cells next to a symbol (including diagonals), build once on first use"""
+        if self._adjacent is None:
+            dilated = [dilate(mask) for mask in self.masks]
+            self._adjacent = [
+                (dilated[y - 1] if y > 0 else 0) | row | (dilated[y + 1] if y + 1 < len(dilated) else 0)
+                for y, row in enumerate(dilated)
+            ]
+        return self._adjacent
+
+    def part_numbers(self, rows=None) -> Iterator[int]:
+        """Ids of the numbers next to any symbol, optionally only numbers on the given rows"""
+        adjacent = self.adjacent
+        for y in range(len(self)) if rows is None else rows:
+            for i in self.numbers(y):
+                if adjacent[y] & (1 << self.ends[i]) - (1 << self.starts[i]):
+                    yield i
+
+    def neighbors(self, x: int, y: int) -> List[int]:
+        """Ids of the numbers touching the cell, on any side"""
+        width = self.width
+        with memoryview(self.labels) as labels:
+            return touching([
+                labels[line * width:(line + 1) * width]
+                for line in range(max(y - 1, 0), min(y + 2, len(self)))
+            ], x)
+
+    def gears(self, rows=None) -> Iterator[Tuple[int, int]]:
+        """Ids of the numbers around `*` symbols touching exactly two numbers, optionally only symbols on the given rows"""
+        for y in range(len(self)) if rows is None else rows:
+            for x, symbol in self.symbols[y]:
+                if symbol == "*":
+                    ids = self.neighbors(x, y)
+                    if len(ids) == 2:
+                        yield ids[0], ids[1]
+
+
+def stream(lines) -> Iterator[Tuple[int, int]]:
+    """
+    Part number sum and gear ratio sum of every row, in order.
+
+    Rows are scanned one at a time, a row is finished as soon as the next one is known.
+    Only a window of three rows is kept, so memory does not grow with the number of rows.
+    """
+    window = deque([None], maxlen=3)  # above, current, below
+    first = 0
+    for line in lines:
+        row = scan_row(line, first)
+        first += len(row.values)
+        window.append(row)
+        if len(window) == 3:
+            yield _finish(*window)
+
+    window.append(None)
+    if len(window) == 3 and window[1] is not None:
+        yield _finish(*window)
+
+
+def _finish(above: Optional[Row], row: Row, below: Optional[Row]) -> Tuple[int, int]:
+    rows = [r for r in (above, row, below) if r is not None]
+
+    adjacent = 0
+    for r in rows:
+        adjacent |= dilate(r.mask)
+
+    part_sum = 0
+    for value, start, end in zip(row.values, row.starts, row.ends):
+        if adjacent & (1 << end) - (1 << start):
+            part_sum += value
+
+    def value(i):
+        for r in rows:
+            if r.first <= i < r.first + len(r.values):
+                return r.values[i - r.first]
+
+    gear_sum = 0
+    for x, symbol in row.symbols:
+        if symbol == "*":
+            ids = touching([r.labels for r in rows], x)
+            if len(ids) == 2:
+                gear_sum += value(ids[0]) * value(ids[1])
+
+    return part_sum, gear_sum
+
+
+def solve_stream(lines) -> Tuple[int, int]:
+    """Both parts from streamed rows, see `stream`"""
+    part_1, part_2 = 0, 0
+    for part_sum, gear_sum in stream(lines):
+        part_1 += part_sum
+        part_2 += gear_sum
+    return part_1, part_2
+
+
+def part_1(schematic: Schematic, rows=None):
     # based on: https://jeff.glass/post/advent-of-code-2023/
+    # rows: only numbers on these rows count, other rows are context (parallel chunks)
+    return sum(schematic.values[i] for i in schematic.part_numbers(rows))
 
-    symbols = set()  # x,y coordinates of symbols
-    part_numbers = []
-
-    number_pattern = re.compile("(\d+)")
-    symbol_pattern = re.compile("([^\d.])")
-
-    for r, row in enumerate(data):
-
-        for s in re.finditer(symbol_pattern, row):
-            symbols.add((s.start(), r))
-
-        for n in re.finditer(number_pattern, row):
-            part_numbers.append(Number(
-                value=int(n.group()),
-                line=r,
-                start=n.start(),
-                end=n.end()
-            ))
-
-    result = 0
-    for number in part_numbers:
-        if (number.start - 1, number.line) in symbols or (number.end, number.line) in symbols:
-            result += number.value
-            continue
-
-        for x in range(number.start - 1, number.end + 1):
-            if (x, number.line - 1) in symbols or (x, number.line + 1) in symbols:
-                result += number.value
-                break
-
-    return result
-
-
-def part_2(data):
-    symbols = set()  # x,y coordinates of symbols
-    part_numbers = []
-
-    gears = defaultdict(list)  # gear -> numbers
-
-    number_pattern = re.compile("(\d+)")
-    symbol_pattern = re.compile("(\*)")
 
-    for r, row in enumerate(data):
+def part_2(schematic: Schematic, rows=None):
+    # rows: only gears on these rows count, other rows are context (parallel chunks)
+    values = schematic.values
+    return sum(values[a] * values[b] for a, b in schematic.gears(rows))
 
-        for s in re.finditer(symbol_pattern, row):
-            symbols.add((s.start(), r))
 
-        for n in re.finditer(number_pattern, row):
-            part_numbers.append(Number(
-                value=int(n.group()),
-                line=r,
-                start=n.start(),
-                end=n.end()
-            ))
+def _part_1_chunk(chunk):
+    return part_1(parse(chunk.lines), chunk.rows)
 
-    for number in part_numbers:
-        if (number.start - 1, number.line) in symbols:
-            gears[(number.start - 1, number.line)].append(number)
-            continue
 
-        if (number.end, number.line) in symbols:
-            gears[(number.end, number.line)].append(number)
-            continue
+def _part_2_chunk(chunk):
+    return part_2(parse(chunk.lines), chunk.rows)
 
-        for x in range(number.start - 1, number.end + 1):
-            if (x, number.line - 1) in symbols:
-                gears[(x, number.line - 1)].append(number)
-                break
 
-            if (x, number.line + 1) in symbols:
-                gears[(x, number.line + 1)].append(number)
-                break
+def part_1_parallel(data, processes=None):
+    """part_1 on chunks of rows across a process pool, each chunk sees one neighbor row on each side"""
+    return map_reduce(_part_1_chunk, data, overlap=1, processes=processes)
 
-    result = 0
-    for gear, numbers in gears.items():
-        if len(numbers) == 2:
-            g1, g2 = numbers
-            result += g1.value * g2.value
 
-    return result
+def part_2_parallel(data, processes=None):
+    """part_2 on chunks of rows across a process pool, each chunk sees one neighbor row on each side"""
+    return map_reduce(_part_2_chunk, data, overlap=1, processes=processes)
 
 
 def parse(lines):
-    # lines = [int(l) for l in lines]
-    return lines
+    return Schematic.from_lines(lines)
 
 
 def main(puzzle_input_f):
-    lines = [l.strip() for l in puzzle_input_f.readlines() if l]
-    print("Part 1: ", part_1(parse(lines[:])))
-    print("Part 2: ", part_2(parse(lines[:])))
+    # rows are streamed from the memory mapped file, only three rows are kept at once
+    with MappedInput(puzzle_input_f) as puzzle:
+        result_1, result_2 = solve_stream(puzzle.lines())
+    print("Part 1: ", result_1)
+    print("Part 2: ", result_2)
 
 
 if __name__ == "__main__":
@@ -29,4 +29,47 @@ def test_part_2(file: Path, expected):
     lines = file.read_text().splitlines()
 
     result = solution.part_2(solution.parse(lines))
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+@pytest.mark.parametrize(
+    "file,expected_1,expected_2",
+    [param(Path(file), expected_1, expected_2, id=file) for file, expected_1, expected_2 in files],
+)
+def test_parallel(file: Path, expected_1, expected_2):
+    lines = file.read_text().splitlines()
+
+    assert solution.part_1_parallel(lines, processes=2) == expected_1
+    assert solution.part_2_parallel(lines, processes=2) == expected_2
+
+
+def test_gears_share_numbers():
+    # both numbers touch both gears, each gear counts them
+    schematic = solution.parse(["..2..", ".*.*.", "..3.."])
+
+    assert [(schematic.values[a], schematic.values[b]) for a, b in schematic.gears()] == [(2, 3), (2, 3)]
+    assert solution.part_2(schematic) == 12
+
+
+def test_symbol_mask():
+    schematic = solution.parse(Path("test_input.txt").read_text().splitlines())
+
+    assert schematic.masks[1] == 1 << 3
+    assert schematic.adjacent[0] == 0b11100  # columns 2 to 4
+    assert 114 not in [schematic.values[i] for i in schematic.part_numbers()]
+
+
+def test_labels():
+    schematic = solution.parse(Path("test_input.txt").read_text().splitlines())
+
+    assert [schematic.label(x, 0) for x in range(10)] == [0, 0, 0, -1, -1, 1, 1, 1, -1, -1]
+    assert [schematic.values[i] for i in schematic.neighbors(3, 1)] == [467, 35]
+    assert schematic.numbers(2) == range(2, 4)
+
+
+@pytest.mark.parametrize(
+    "file,expected_1,expected_2",
+    [param(Path(file), expected_1, expected_2, id=file) for file, expected_1, expected_2 in files],
+)
+def test_stream(file: Path, expected_1, expected_2):
+    with file.open() as f:
+        assert solution.solve_stream(line.rstrip("\n") for line in f) == (expected_1, expected_2)
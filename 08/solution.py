@@ -1,10 +1,16 @@
 # fmt: off
 import sys
-from itertools import cycle, count
-from math import lcm
+from dataclasses import dataclass
+from itertools import cycle
+from math import gcd
+from typing import List
+
+import numpy as np
 
 sys.path.append("..")
 
+from utils.reader import MappedInput
+
 
 # fmt: on
 
@@ -55,29 +61,290 @@ def walk(start, inst, world):
         yield current
 
 
-def part_2(data):
-    instructions = data.pop(0)
-    _ = data.pop(0)
+def parse_network(data):
+    """Instructions and world (node -> (left, right)), does not modify data"""
+    instructions = data[0]
     world = dict()
-    for line in data:
+    for line in data[2:]:
         loc = line[0:3]
         left = line[7:10]
         right = line[12:15]
 
         world[loc] = (left, right)
 
-    runner = [walk(k, instructions, world) for k in world.keys() if k.endswith("A")]
+    return instructions, world
+
+
+@dataclass
+class Cycle:
+    """
+    Steps of a runner, which end on a Z node.
+    States (node, instruction index) repeat after `tail` steps every `length` steps.
+    """
+    tail: int
+    length: int
+    tail_hits: List[int]  # steps < tail
+    cycle_hits: List[int]  # steps in [tail, tail + length)
+
+    def at_z(self, step) -> bool:
+        if step < self.tail:
+            return step in self.tail_hits
+        return (step - self.tail) % self.length + self.tail in self.cycle_hits
+
+
+def analyze(start, inst, world) -> Cycle:
+    """Walks until a (node, instruction index) state repeats"""
+    seen = {(start, 0): 0}
+    hits = []
+
+    for step, current in enumerate(walk(start, inst, world), 1):
+        state = (current, step % len(inst))
+        if state in seen:
+            tail = seen[state]
+            return Cycle(
+                tail=tail,
+                length=step - tail,
+                tail_hits=[h for h in hits if h < tail],
+                cycle_hits=[h for h in hits if h >= tail],
+            )
+
+        seen[state] = step
+        if current.endswith("Z"):
+            hits.append(step)
+
+
+class Network:
+    """
+    Network compiled to integer node ids with left/right successor lists.
+
+    A full pass over the instructions is precomputed per node, with binary lifting tables on top,
+    so runners can jump whole instruction passes at once.
+    """
+
+    def __init__(self, instructions, world):
+        self.instructions = instructions
+        self.names = list(world)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.left = [self.ids[left] for left, _ in world.values()]
+        self.right = [self.ids[right] for _, right in world.values()]
+        self.is_z = [name.endswith("Z") for name in self.names]
+
+        for d in instructions:
+            if d not in "LR":
+                raise ValueError("Unknown direction")
+        # successor list to use for each instruction index
+        self.moves = [self.left if d == "L" else self.right for d in instructions]
+
+        self._passes = None
+        self._pass_hits = None
+        self._lifting = []
+
+    @staticmethod
+    def parse(data) -> "Network":
+        return Network(*parse_network(data))
+
+    def _build_passes(self):
+        passes = []
+        pass_hits = []
+        is_z = self.is_z
+        for node in range(len(self.names)):
+            hits = []
+            for offset, move in enumerate(self.moves, 1):
+                node = move[node]
+                if is_z[node]:
+                    hits.append(offset)
+            passes.append(node)
+            pass_hits.append(hits)
+
+        self._passes = passes
+        self._pass_hits = pass_hits
+        self._lifting = [passes]
+
+    @property
+    def passes(self) -> List[int]:
+        """Node after one full pass over the instructions, per start node"""
+        if self._passes is None:
+            self._build_passes()
+        return self._passes
+
+    @property
+    def pass_hits(self) -> List[List[int]]:
+        """Steps (1 to len(instructions)) within one pass which end on a Z node, per start node"""
+        if self._pass_hits is None:
+            self._build_passes()
+        return self._pass_hits
+
+    def _jump(self, node, passes):
+        """Node after the given amount of passes, using binary lifting"""
+        level = 0
+        while passes:
+            if level == len(self._lifting):
+                previous = self._lifting[-1]
+                self._lifting.append([previous[n] for n in previous])
+
+            if passes & 1:
+                node = self._lifting[level][node]
+            passes >>= 1
+            level += 1
+        return node
+
+    def advance(self, node, steps, index=0):
+        """
+        State after the given steps, starting at node with instruction index.
+
+        Whole passes are jumped in O(log(steps)), only the steps to and from a pass boundary are walked.
+        :return: (node, instruction index)
+        """
+        moves = self.moves
+        size = len(moves)
+        self.passes  # make sure the lifting tables exist
+
+        while index and steps:
+            node = moves[index][node]
+            index = (index + 1) % size
+            steps -= 1
+
+        if index:
+            return node, index
+
+        passes, steps = divmod(steps, size)
+        node = self._jump(node, passes)
+
+        for index in range(steps):
+            node = moves[index][node]
+        return node, steps
+
+    def analyze(self, start) -> Cycle:
+        """Same as `analyze`, but walks whole passes. The tail is rounded up to full passes."""
+        passes, pass_hits = self.passes, self.pass_hits
+        size = len(self.moves)
+        node = self.ids[start]
+
+        seen = {}
+        order = []
+        while node not in seen:
+            seen[node] = len(order)
+            order.append(node)
+            node = passes[node]
+
+        tail = seen[node] * size
+        length = (len(order) - seen[node]) * size
+        hits = [p * size + offset for p, n in enumerate(order) for offset in pass_hits[n]]
+
+        return Cycle(
+            tail=tail,
+            length=length,
+            tail_hits=[h for h in hits if h < tail],
+            # a hit at the end of the last pass is the start of the cycle again
+            cycle_hits=sorted({h if h < tail + length else h - length for h in hits if h >= tail}),
+        )
+
+
+def crt(a1, m1, a2, m2):
+    """Combines x = a1 (mod m1) and x = a2 (mod m2), moduli do not have to be coprime. None if unsolvable."""
+    g = gcd(m1, m2)
+    if (a2 - a1) % g:
+        return None
+
+    k = (a2 - a1) // g * pow(m1 // g, -1, m2 // g) % (m2 // g)
+    modulus = m1 // g * m2
+    return (a1 + m1 * k) % modulus, modulus
+
+
+def first_common_hit(cycles: List[Cycle]):
+    """First step (>= 1) at which every runner is on a Z node, None if it never happens"""
+    # before all runners entered their cycle, check the hits of the first runner one by one
+    settled = max(c.tail for c in cycles)
+    first = cycles[0]
+    candidates = [h for h in first.tail_hits if h < settled]
+    for h in first.cycle_hits:
+        candidates.extend(range(h, settled, first.length))
+
+    for step in sorted(candidates):
+        if step >= 1 and all(c.at_z(step) for c in cycles):
+            return step
+
+    # afterwards each runner is periodic, combine all residue classes
+    residues = {(0, 1)}
+    for c in cycles:
+        residues = {
+            combined
+            for a, m in residues
+            for h in c.cycle_hits
+            if (combined := crt(a, m, h % c.length, c.length)) is not None
+        }
+
+    if not residues:
+        return None
+
+    # smallest solution >= settled
+    lowest = max(settled, 1)
+    return min(a + max(0, -(-(lowest - a) // m)) * m for a, m in residues)
+
+
+def part_2(data):
+    network = Network.parse(data)
+
+    cycles = [network.analyze(k) for k in network.names if k.endswith("A")]
+
+    return first_common_hit(cycles)
+
+
+def part_2_brute(data, limit=10 ** 9):
+    """
+    Steps all ghosts together as a NumPy index vector, without assuming anything about cycles.
+
+    A N x len(instructions) matrix marks for every start node which steps of a pass end on a Z node,
+    it is built by stepping all nodes at once, one instruction at a time.
+    Then ghosts jump pass by pass, the step where all of them are on Z is a vectorized all() over their rows.
+
+    :return: first step where all ghosts are on a Z node, None if it is above limit
+    """
+    network = Network.parse(data)
+    size = len(network.moves)
+
+    is_z = np.array(network.is_z, dtype=bool)
+    moves = [np.array(move, dtype=np.int64) for move in network.moves]
+
+    nodes = np.arange(len(network.names))
+    hits = np.empty((len(nodes), size), dtype=bool)
+    for index, move in enumerate(moves):
+        nodes = move[nodes]
+        hits[:, index] = is_z[nodes]
+    passes = nodes
+
+    ghosts = np.array([network.ids[k] for k in network.names if k.endswith("A")], dtype=np.int64)
+    for done in range(0, limit, size):
+        common = hits[ghosts].all(axis=0)
+        if common.any():
+            step = done + int(common.argmax()) + 1
+            return step if step <= limit else None
+        ghosts = passes[ghosts]
+
+    return None
+
+
+def benchmark(file="input.txt", steps=1_000_000):
+    """Compares the `walk()` generator with `Network.advance()` for the given steps"""
+    from time import perf_counter
+
+    with open(file) as f:
+        data = [l.strip() for l in f.readlines()]
+    instructions, world = parse_network(data)
+    start = next(k for k in world if k.endswith("A"))
 
-    intergers = []
+    ts = perf_counter()
+    for current, _ in zip(walk(start, instructions, world), range(steps)):
+        pass
+    t_walk = perf_counter() - ts
 
-    for r in runner:
-        for i in count(1):
-            current = next(r)
-            if current.endswith("Z"):
-                intergers.append(i)
-                break
+    ts = perf_counter()
+    network = Network(instructions, world)
+    node, _ = network.advance(network.ids[start], steps)
+    t_advance = perf_counter() - ts
 
-    return lcm(*intergers)
+    assert network.names[node] == current
+    print(f"walk(): {t_walk:2.4f} sec, Network.advance(): {t_advance:2.4f} sec (incl. compile) for {steps} steps")
 
 
 def parse(lines):
@@ -86,9 +353,10 @@ def parse(lines):
 
 
 def main(puzzle_input_f):
-    lines = [l.strip() for l in puzzle_input_f.readlines() if l]
-    print("Part 1: ", part_1(parse(lines[:])))
-    print("Part 2: ", part_2(parse(lines[:])))
+    # part_1 pops the header lines, so each part gets its own list
+    with MappedInput(puzzle_input_f) as puzzle:
+        print("Part 1: ", part_1(parse(list(puzzle.lines()))))
+        print("Part 2: ", part_2(parse(list(puzzle.lines()))))
     # falsch: 145288587985807687534080
 
 
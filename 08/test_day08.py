@@ -30,4 +30,51 @@ def test_part_2(file: Path, expected):
     lines = file.read_text().splitlines()
 
     result = solution.part_2(solution.parse(lines))
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+
+def test_part_2_without_lcm_shortcut():
+    # AAA hits BBZ at 1, 4, 7, ... and EEA hits GGZ at 2, 4, 6, ..., lcm of the first hits would be 2
+    lines = [
+        "L",
+        "",
+        "AAA = (BBZ, BBZ)",
+        "BBZ = (CCC, CCC)",
+        "CCC = (DDD, DDD)",
+        "DDD = (BBZ, BBZ)",
+        "EEA = (FFF, FFF)",
+        "FFF = (GGZ, GGZ)",
+        "GGZ = (FFF, FFF)",
+    ]
+
+    result = solution.part_2(solution.parse(lines))
+    assert result == 4
+
+
+def test_analyze():
+    lines = Path("test_input_2.txt").read_text().splitlines()
+    instructions, world = solution.parse_network(lines)
+
+    cycle = solution.analyze("22A", instructions, world)
+    assert (cycle.tail, cycle.length, cycle.cycle_hits) == (1, 6, [3, 6])
+
+
+@pytest.mark.parametrize("steps", [0, 1, 2, 5, 17])
+def test_network_advance(steps):
+    lines = Path("test_input_2.txt").read_text().splitlines()
+    instructions, world = solution.parse_network(lines)
+    network = solution.Network(instructions, world)
+
+    expected = "22A"
+    for _, expected in zip(range(steps), solution.walk("22A", instructions, world)):
+        pass
+
+    node, index = network.advance(network.ids["22A"], steps)
+    assert (network.names[node], index) == (expected, steps % len(instructions))
+
+
+def test_part_2_brute():
+    lines = Path("test_input_2.txt").read_text().splitlines()
+
+    assert solution.part_2_brute(solution.parse(lines)) == solution.part_2(solution.parse(lines)) == 6
+    assert solution.part_2_brute(solution.parse(lines), limit=5) is None
@@ -1,101 +1,98 @@
 # fmt: off
 import sys
-from itertools import permutations
-
-from utils.parse import map_from_lines
-from utils.path import manhattan
-from utils.vector import Vec2
+from array import array
+from bisect import bisect_left
 
 sys.path.append("..")
 
+from utils.reader import MappedInput
+
 
 # fmt: on
 
 def part_1(data):
-    data = expand(data)
-    world = map_from_lines(data)
+    return distance_sum(data, n=2)
 
-    galaxies = [pos for pos, c in world.items() if c == "#"]
 
-    result = 0
-    for g1, g2 in permutations(galaxies, 2):
-        result += manhattan(g1, g2)
-    return result // 2
+def part_2(data, n=1000000):
+    return distance_sum(data, n)
 
 
-def part_2(data, n=1000000):
-    x_ex, y_ex = expanders(data)
+def distance_sum(data, n):
+    """
+    Sum of distances between all galaxy pairs, every empty row and column is replaced by n.
 
-    world = map_from_lines(data)
-    galaxies = [pos for pos, c in world.items() if c == "#"]
+    Manhattan distance is separable, so each axis is summed on its own in O(g log g).
+    """
+    xs, ys, x_ex, y_ex = scan(data)
 
-    expanded_world = {}
-    for g in galaxies:
-        x, y = g
+    xs = [expand_coordinate(x, x_ex, n) for x in xs]
+    ys = [expand_coordinate(y, y_ex, n) for y in ys]
 
-        for ex in x_ex:
-            if g.x > ex:
-                x += n-1
-            else:
-                break
+    return axis_distance_sum(xs) + axis_distance_sum(ys)
 
-        for ex in y_ex:
-            if g.y > ex:
-                y += n-1
-            else:
-                break
 
-        expanded_world[Vec2(x, y)] = "#"
+def scan(lines):
+    """
+    Reads galaxy coordinates, empty columns and empty rows in one pass over the lines.
 
-    result = 0
-    for g1, g2 in permutations(expanded_world, 2):
-        result += manhattan(g1, g2)
+    Lines can be streamed (e.g. a file object), memory scales with the number of galaxies.
+    :return: xs, ys of all galaxies, x_expanders, y_expanders (sorted)
+    """
+    xs = array("q")
+    ys = array("q")
+    y_expanders = []
+    columns = set()
+    width = 0
 
-    return result // 2
+    for y, line in enumerate(lines):
+        line = line.rstrip("\n")
+        width = max(width, len(line))
 
+        x = line.find("#")
+        if x == -1:
+            y_expanders.append(y)
 
-def parse(lines):
-    # lines = [int(l) for l in lines]
-    return lines
+        while x != -1:
+            xs.append(x)
+            ys.append(y)
+            columns.add(x)
+            x = line.find("#", x + 1)
 
+    x_expanders = [x for x in range(width) if x not in columns]
+    return xs, ys, x_expanders, y_expanders
 
-def expand(lines):
-    expanded = []
-    for l in lines:
-        expanded.append(l)
-        if "#" not in l:
-            expanded.append(l)
-
-    # flip lines
-    flipped = list(zip(*expanded))
-    expanded_2 = []
-    for l in flipped:
-        expanded_2.append(l)
-        if "#" not in l:
-            expanded_2.append(l)
-    lines = list(zip(*expanded_2))
-    return lines
 
-def expanders(lines):
-    y_expanders = []
-    for y, l in enumerate(lines):
-        if "#" not in l:
-            y_expanders.append(y)
+def expand_coordinate(value, expanders, n):
+    """Shifts the coordinate by n-1 for every expander before it, expanders have to be sorted"""
+    return value + bisect_left(expanders, value) * (n - 1)
 
-    flipped = list(zip(*lines))
 
-    x_expanders = []
-    for x, l in enumerate(flipped):
-        if "#" not in l:
-            x_expanders.append(x)
+def axis_distance_sum(values):
+    """Sum of |a - b| over all pairs, using sorted values and a prefix sum"""
+    result = 0
+    prefix = 0
+    for i, value in enumerate(sorted(values)):
+        result += value * i - prefix
+        prefix += value
+    return result
+
 
+def parse(lines):
+    # lines = [int(l) for l in lines]
+    return lines
+
+
+def expanders(lines):
+    _, _, x_expanders, y_expanders = scan(lines)
     return x_expanders, y_expanders
 
 
 def main(puzzle_input_f):
-    lines = [l.strip() for l in puzzle_input_f.readlines() if l]
-    print("Part 1: ", part_1(parse(lines[:])))
-    print("Part 2: ", part_2(parse(lines[:])))
+    # lines are read lazily from the memory mapped file
+    with MappedInput(puzzle_input_f) as puzzle:
+        print("Part 1: ", part_1(parse(puzzle.lines())))
+        print("Part 2: ", part_2(parse(puzzle.lines())))
 
 
 if __name__ == "__main__":
@@ -29,4 +29,22 @@ def test_part_2(file: Path, expected):
     lines = file.read_text().splitlines()
 
     result = solution.part_2(solution.parse(lines), n=10)
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+
+@pytest.mark.parametrize("n,expected", [(2, 374), (10, 1030), (100, 8410)])
+def test_distance_sum(n, expected):
+    lines = Path("test_input.txt").read_text().splitlines()
+
+    result = solution.distance_sum(solution.parse(lines), n)
+    assert result == expected
+
+
+def test_scan_streams_file():
+    with Path("test_input.txt").open() as f:
+        xs, ys, x_expanders, y_expanders = solution.scan(f)
+
+    assert len(xs) == len(ys) == 9
+    assert x_expanders == [2, 5, 8]
+    assert y_expanders == [3, 7]
+
@@ -0,0 +1,135 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _compile(patterns: Dict[str, Any]) -> Tuple[List[Dict[str, int]], List[Tuple[Tuple[int, Any], ...]]]:
+    """
+    Builds the automaton as full transition table and outputs per state.
+    Outputs are (pattern length, value), longest pattern first.
+    """
+    goto: List[Dict[str, int]] = [{}]
+    outputs: List[List[Tuple[int, Any]]] = [[]]
+
+    # trie
+    for pattern, value in patterns.items():
+        state = 0
+        for c in pattern:
+            if c not in goto[state]:
+                goto.append({})
+                outputs.append([])
+                goto[state][c] = len(goto) - 1
+            state = goto[state][c]
+        outputs[state].append((len(pattern), value))
+
+    # failure links in BFS order, merged into full transitions
+    alphabet = {c for pattern in patterns for c in pattern}
+    fail = [0] * len(goto)
+    delta: List[Dict[str, int]] = [dict() for _ in goto]
+    delta[0] = {c: goto[0].get(c, 0) for c in alphabet}
+
+    todo = deque(goto[0].values())
+    while todo:
+        state = todo.popleft()
+        outputs[state] = outputs[state] + outputs[fail[state]]
+        for c in alphabet:
+            if c in goto[state]:
+                child = goto[state][c]
+                fail[child] = delta[fail[state]][c]
+                delta[state][c] = child
+                todo.append(child)
+            else:
+                delta[state][c] = delta[fail[state]][c]
+
+    # drop transitions back to the root, they are the default
+    delta = [{c: s for c, s in d.items() if s} for d in delta]
+    return delta, [tuple(sorted(o, key=lambda e: -e[0])) for o in outputs]
+
+
+class AhoCorasick:
+    """
+    Multi pattern matcher (Aho–Corasick automaton), finds (overlapping) occurrences of many patterns in one pass.
+
+    Patterns map to a value, which is reported for each match.
+    The automaton is compiled to a full transition table, so each character costs one dict lookup.
+    A second automaton over the reversed patterns finds the last match by scanning from the end.
+    """
+
+    def __init__(self, patterns: Dict[str, Any]):
+        self._delta, self._outputs = _compile(patterns)
+        self._r_delta, self._r_outputs = _compile({p[::-1]: v for p, v in patterns.items()})
+        self._max_length = max(map(len, patterns), default=0)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, Any]]:
+        """All matches as (start, value), ordered by their end"""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for i, c in enumerate(text):
+            state = delta[state].get(c, 0)
+            for length, value in outputs[state]:
+                yield i - length + 1, value
+
+    def first(self, text: str, start=0, end=None) -> Optional[Any]:
+        """
+        Value of the match starting first in text[start:end], None without a match.
+        Of several matches starting at the same position the longest one wins, same as in `last`.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        end = len(text) if end is None else end
+
+        found = None
+        found_start = stop = end
+        found_length = 0
+        state = 0
+        for i in range(start, end):
+            state = delta[state].get(text[i], 0)
+            if outputs[state]:
+                for length, value in outputs[state]:
+                    if (i - length + 1, -length) < (found_start, -found_length):
+                        found, found_start, found_length = value, i - length + 1, length
+                # matches ending later can not start before the found one
+                stop = found_start + self._max_length - 1
+
+            if i >= stop:
+                break
+
+        return found
+
+    def last(self, text: str, start=0, end=None) -> Optional[Any]:
+        """
+        Value of the match starting last in text[start:end], None without a match.
+        Of several matches starting at the same position the longest one wins, same as in `first`.
+        """
+        delta = self._r_delta
+        outputs = self._r_outputs
+        end = len(text) if end is None else end
+
+        state = 0
+        for i in range(end - 1, start - 1, -1):
+            state = delta[state].get(text[i], 0)
+            if outputs[state]:
+                # a reversed match ending here starts here, longest pattern first
+                return outputs[state][0][1]
+
+        return None
+
+    def first_last(self, text: str, start=0, end=None) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Values of the matches starting first and last, (None, None) without a match.
+        Scans from the front and from the back, each scan stops shortly after its first match.
+        Characters between the matches can be visited by both scans, a text without a match is scanned twice.
+        """
+        return self.first(text, start, end), self.last(text, start, end)
+
+    def lines(self, buffer: str) -> Iterator[Tuple[Optional[Any], Optional[Any]]]:
+        """`first_last` for every not empty line of a buffer (e.g. a whole file), without splitting it"""
+        start = 0
+        while start < len(buffer):
+            end = buffer.find("\n", start)
+            if end == -1:
+                end = len(buffer)
+
+            if end > start:
+                yield self.first_last(buffer, start, end)
+            start = end + 1
@@ -1,7 +1,16 @@
-from collections import defaultdict
+import asyncio
+import json
+import math
+import sys
+from array import array
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from multiprocessing import Pool
 from queue import Queue
 from threading import Thread
-from typing import List, Tuple, Dict, Union
+from time import perf_counter
+from typing import List, Tuple, Dict, Union, Optional, Any, Iterable, Sequence, Callable
 
 
 # class Ref(int):
@@ -67,19 +76,271 @@ class Var(Param):
         return f"Var[{self()}]"
 
 
+OP_PARAMS = {1: 3, 2: 3, 3: 1, 4: 1, 5: 2, 6: 2, 7: 3, 8: 3, 9: 1, 99: 0}
+"""Amount of parameters per OP code"""
+
+OP_NAMES = {1: "ADD", 2: "MUL", 3: "RIN", 4: "PUT", 5: "JIT", 6: "JIF", 7: "LET", 8: "EQL", 9: "RBO", 99: "END"}
+"""Short names per OP code, as used in the debug log"""
+
+_DECODE: Dict[int, Tuple[int, int, int, int]] = {
+    op + 100 * m1 + 1000 * m2 + 10000 * m3: (op, m1, m2, m3)
+    for op, params in OP_PARAMS.items()
+    for m1 in ((0, 2) if op == 3 else range(3) if params > 0 else (0,))
+    for m2 in (range(3) if params > 1 else (0,))
+    for m3 in ((0, 2) if params > 2 else (0,))
+}
+"""Pre-decoded instructions, maps every valid instruction to (op, mode 1, mode 2, mode 3)"""
+
+
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS
+"""Cells per memory page"""
+_PAGE_MASK = PAGE_SIZE - 1
+
+
+def _page(values: Sequence[int] = ()) -> Union[array, List[int]]:
+    """Page filled with the values and padded with 0, a list if a value does not fit into 64 bit"""
+    try:
+        page = array("q", values)
+    except OverflowError:
+        page = list(values)
+    page.extend([0] * (PAGE_SIZE - len(page)))
+    return page
+
+
+class Memory:
+    """
+    Paged, auto growing memory of an Intcode program.
+
+    Cells are stored in pages of `PAGE_SIZE` cells, each an `array('q')`,
+    which switches to a plain list as soon as a value does not fit into 64 bit.
+    Addresses above `sparse_limit` are kept in a sparse dict instead of adding pages,
+    `sparse_limit=None` always adds pages.
+
+    `fork()` shares all pages and the sparse dict copy-on-write.
+    Each memory tracks which pages it owns, the first write to a shared page copies only that page.
+
+    `size` tracks the address after the highest cell loaded or written to the pages.
+    """
+
+    def __init__(self, program: List[int], sparse_limit: Optional[int] = 1 << 20):
+        self.pages: List[Union[array, List[int]]] = [
+            _page(program[i:i + PAGE_SIZE]) for i in range(0, len(program), PAGE_SIZE)
+        ]
+        self.owned = bytearray(b"\x01") * len(self.pages)  # 0 for pages shared with a fork
+        self.size = len(program)
+        self.overflow: Dict[int, int] = {}
+        self.overflow_owned = True
+        self.sparse_limit = sparse_limit
+
+    @property
+    def capacity(self) -> int:
+        return len(self.pages) << PAGE_BITS
+
+    @property
+    def shared(self) -> bool:
+        """True if any page or the sparse cells are shared with a fork"""
+        return not (all(self.owned) and self.overflow_owned)
+
+    def fork(self) -> "Memory":
+        """Copy of this memory, which shares every page until one of them writes to it"""
+        memory = Memory.__new__(Memory)
+        memory.pages = self.pages[:]
+        memory.owned = bytearray(len(self.pages))
+        # in place, engines keep references to the pages and flags while running
+        self.owned[:] = memory.owned
+        memory.size = self.size
+        memory.overflow = self.overflow
+        memory.overflow_owned = self.overflow_owned = False
+        memory.sparse_limit = self.sparse_limit
+        return memory
+
+    def __len__(self):
+        """Address after the highest used cell, including sparse cells"""
+        if self.overflow:
+            return max(self.size, max(self.overflow) + 1)
+        return self.size
+
+    def __getitem__(self, key) -> Union[int, Tuple[int]]:
+        if type(key) is slice:
+            start, stop, step = key.start, key.stop, key.step
+            if start is None:
+                start = 0
+            if stop is None:
+                stop = len(self)
+            if step is None:
+                step = 1
+
+            if 0 <= start and stop <= self.capacity and step > 0:
+                return tuple(islice(chain.from_iterable(self.pages), start, stop, step))
+            return tuple(self[i] for i in range(start, stop, step))
+
+        if 0 <= key < len(self.pages) << PAGE_BITS:
+            return self.pages[key >> PAGE_BITS][key & _PAGE_MASK]
+        return self.overflow.get(key, 0)
+
+    def __setitem__(self, key: int, value: int):
+        pages = self.pages
+        if not 0 <= key < len(pages) << PAGE_BITS:
+            if key < 0 or (self.sparse_limit is not None and key >= self.sparse_limit):
+                if not self.overflow_owned:
+                    self.overflow = self.overflow.copy()
+                    self.overflow_owned = True
+                self.overflow[key] = value
+                return
+
+            while len(pages) <= key >> PAGE_BITS:
+                pages.append(_page())
+                self.owned.append(1)
+
+        index = key >> PAGE_BITS
+        if not self.owned[index]:
+            pages[index] = pages[index][:]
+            self.owned[index] = 1
+
+        if key >= self.size:
+            self.size = key + 1
+
+        try:
+            pages[index][key & _PAGE_MASK] = value
+        except OverflowError:
+            pages[index] = list(pages[index])
+            pages[index][key & _PAGE_MASK] = value
+
+    def copy(self) -> Dict[int, int]:
+        memory = defaultdict(int, enumerate(islice(chain.from_iterable(self.pages), self.size)))
+        memory.update(self.overflow)
+        return memory
+
+    def usage(self) -> Dict[str, Any]:
+        """Reports the size of the memory"""
+        buffer_bytes = 0
+        typecodes = set()
+        for page in self.pages:
+            if isinstance(page, array):
+                buffer_bytes += page.buffer_info()[1] * page.itemsize
+                typecodes.add(page.typecode)
+            else:
+                buffer_bytes += sys.getsizeof(page) + sum(map(sys.getsizeof, page))
+                typecodes.add("int")
+
+        return {
+            "cells": self.size,
+            "capacity": self.capacity,
+            "pages": len(self.pages),
+            "shared_pages": self.owned.count(0),
+            "sparse_cells": len(self.overflow),
+            "typecode": "/".join(sorted(typecodes)),
+            "buffer_bytes": buffer_bytes,
+            "sparse_bytes": sys.getsizeof(self.overflow),
+        }
+
+
+# States returned by `Interpreter.resume()`
+WAITING = "waiting"
+OUTPUT = "output"
+FINISHED = "finished"
+
+
+class Buffer(deque):
+    """
+    Unbounded, unlocked I/O buffer for cooperative interpreters.
+    Provides the parts of the `Queue` interface used by the engines.
+    """
+
+    put = deque.append
+
+    def get(self):
+        return self.popleft()
+
+    def empty(self):
+        return not self
+
+
+def _buffered(io: Union[Queue, Buffer]) -> Tuple[int, ...]:
+    """Values currently queued in stdin or stdout"""
+    return tuple(io.queue if isinstance(io, Queue) else io)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """State of an `Interpreter`, see `Interpreter.snapshot()`"""
+
+    memory: Memory
+    ip: int
+    rbo: int
+    finished: bool
+    stdin: Tuple[int, ...]
+    stdout: Tuple[int, ...]
+
+
+@dataclass
+class Profile:
+    """
+    Counters collected by a profiling `Interpreter`.
+
+    Counting costs two dict increments per instruction, so the timing of a program stays comparable.
+    """
+
+    op_counts: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    ip_counts: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    input_wait: float = 0.0  # seconds blocked on (or paused for) input
+    memory_high_water: int = 0  # address after the highest cell loaded or written
+
+    @property
+    def instructions(self) -> int:
+        return sum(self.op_counts.values())
+
+    def count(self, ip: int, op: int):
+        self.op_counts[op] += 1
+        self.ip_counts[ip] += 1
+
+    def hot_spots(self, n=10) -> List[Tuple[int, int]]:
+        """Most executed instruction pointers as (ip, count)"""
+        return sorted(self.ip_counts.items(), key=lambda e: (-e[1], e[0]))[:n]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "instructions": self.instructions,
+            "ops": {OP_NAMES.get(op, str(op)): count for op, count in sorted(self.op_counts.items())},
+            "ips": dict(sorted(self.ip_counts.items())),
+            "input_wait": self.input_wait,
+            "memory_high_water": self.memory_high_water,
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
 class Interpreter:
     DEBUG = False
 
-    def __init__(self, program: List[int]) -> None:
+    def __init__(self, program: List[int], compiled=False, cooperative=False, profile=False) -> None:
+        """
+        :param program: Intcode program
+        :param compiled: use the pre-decoded fast path engine instead of `step()` for `run()`
+        :param cooperative: use `Buffer` for stdin/stdout and pause on missing input instead of blocking,
+                            see `resume()`
+        :param profile: count executed instructions and input wait time, see `profile`
+        """
         super().__init__()
-        self._memory: Dict[int, int] = defaultdict(
-            int, {k: v for k, v in enumerate(program)}
-        )
+        self._compiled = compiled
+        self._cooperative = cooperative
+        self._profile: Optional[Profile] = Profile() if profile else None
+        self._waiting_since: Optional[float] = None
+        self._input_ready: Optional[asyncio.Event] = None  # created by the first `aget()` waiting for input
+        self._memory = Memory(program)
+        if self._profile is not None:
+            self._profile.memory_high_water = len(program)
         self._ip = 0  # Instruction Counter
         self._rbo = 0  # Relative Base Offset
         self._finished = False
-        self.stdout = Queue()
-        self.stdin = Queue()
+        if cooperative:
+            self.stdout = Buffer()
+            self.stdin = Buffer()
+        else:
+            self.stdout = Queue()
+            self.stdin = Queue()
 
         self._log_prefix = ""
 
@@ -87,30 +348,82 @@ class Interpreter:
     def finished(self):
         return self._finished
 
+    @property
+    def profile(self) -> Optional[Profile]:
+        """Collected counters, None if the interpreter was not created with `profile=True`"""
+        return self._profile
+
     def log(self, *text):
         if self.DEBUG:
             print(self._log_prefix, *text)
 
     @staticmethod
-    def from_file(file):
+    def from_file(file, **kwargs):
         with open(file) as f:
             program = [int(e) for e in f.read().split(",")]
-        return Interpreter(program)
+        return Interpreter(program, **kwargs)
 
     def put(self, value):
         """Adds value to stdin"""
         self.stdin.put(value)
+        if self._input_ready is not None:
+            self._input_ready.set()
 
     def get(self):
-        """Reads value from stdout, blocks if empty"""
-        return self.stdout.get()
+        """
+        Reads value from stdout, blocks if empty.
+
+        In cooperative mode the program runs until it writes a value,
+        returns None if it finished or waits for input instead.
+        """
+        if not self._cooperative:
+            return self.stdout.get()
+
+        if not self.stdout:
+            self.resume(until_output=True)
+        return self.stdout.popleft() if self.stdout else None
 
     def stream(self):
+        if self._cooperative:
+            # yields values until the program finished or needs input
+            while True:
+                status = self.resume(until_output=True)
+                while self.stdout:
+                    yield self.stdout.popleft()
+                if status != OUTPUT:
+                    return
+
         while not self.finished:
             output_value = self.stdout.get()
             if output_value is not None:
                 yield output_value
 
+    async def aput(self, value):
+        """Adds value to stdin and wakes a waiting `aget()`, for cooperative interpreters hosted in an event loop"""
+        self.put(value)
+        await asyncio.sleep(0)
+
+    async def aget(self):
+        """
+        Reads value from stdout, for cooperative interpreters hosted in an event loop.
+
+        Runs the program until it writes a value, while waiting for input control is given back to the loop
+        until `put()` or `aput()` adds a value.
+        Returns None if the program finished.
+        """
+        while not self.stdout:
+            status = self.resume(until_output=True)
+            if status == FINISHED:
+                break
+            if status == WAITING:
+                if self._input_ready is None:
+                    self._input_ready = asyncio.Event()
+                self._input_ready.clear()
+                if not self.stdin:
+                    await self._input_ready.wait()
+
+        return self.stdout.popleft() if self.stdout else None
+
     def _read(self, amount, modes="") -> List[Ref]:
         modes = modes.zfill(amount)
 
@@ -131,25 +444,16 @@ class Interpreter:
         """
         Returns value from memory. Can handle slices
         """
-
-        if type(key) is slice:
-            start = key.start
-            stop = key.stop
-            step = key.step
-
-            if start is None:
-                start = min(self._memory.keys())
-            if stop is None:
-                stop = max(self._memory.keys()) + 1
-            if step is None:
-                step = 1
-
-            return tuple(self._memory[i] for i in range(start, stop, step))
-
         return self._memory[key]
 
     def __setitem__(self, key, value: int):
         self._memory[key] = value
+        if self._profile is not None and key >= self._profile.memory_high_water:
+            self._profile.memory_high_water = key + 1
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Reports cells and bytes used by the memory, see `Memory.usage()`"""
+        return self._memory.usage()
 
     def start(self):
         thread = Thread(target=self.run, daemon=True)
@@ -158,11 +462,206 @@ class Interpreter:
 
     def run(self):
         try:
-            while not self._finished:
-                self.step()
+            if self._cooperative:
+                self.resume()
+            elif self._compiled:
+                self._run_compiled()
+            else:
+                self._run_steps()
         except Exception as e:
             print("Stopped execution:", str(e))
 
+    def resume(self, until_output=False) -> str:
+        """
+        Runs a cooperative interpreter until it needs input which is not available yet or the program finished.
+
+        :param until_output: also pause after each value written to stdout
+        :return: WAITING, OUTPUT or FINISHED
+        """
+        if not self._cooperative:
+            raise Exception("resume() requires a cooperative interpreter")
+
+        if self._finished:
+            return FINISHED
+
+        if self._profile is not None and self._waiting_since is not None:
+            self._profile.input_wait += perf_counter() - self._waiting_since
+            self._waiting_since = None
+
+        if self._compiled:
+            status = self._run_compiled(until_output)
+        else:
+            status = self._run_steps(until_output)
+
+        if self._profile is not None and status == WAITING:
+            self._waiting_since = perf_counter()
+        return status
+
+    def _run_steps(self, until_output=False) -> str:
+        """Calls `step()` until finished, in cooperative mode also until input is missing"""
+        cooperative = self._cooperative
+        while not self._finished:
+            if cooperative:
+                if not self.stdin and self._memory[self._ip] % 100 == 3:
+                    return WAITING
+                outputs = len(self.stdout)
+
+            self.step()
+            if until_output and len(self.stdout) > outputs:
+                return OUTPUT
+
+        return FINISHED
+
+    def _run_compiled(self, until_output=False) -> str:
+        """
+        Fast path engine, produces the same results as calling `step()` until finished.
+
+        Instructions are looked up in the pre-decoded `_DECODE` table and executed directly on the memory pages,
+        without creating `Param` objects. Writes to shared pages or above the used cells go through `Memory`,
+        which copies or adds pages, and refresh the local state.
+        """
+        memory = self._memory
+        # Memory changes pages and flags in place, so these stay valid
+        pages = memory.pages
+        owned = memory.owned
+        over = memory.overflow
+        capacity = memory.capacity
+        write_size = memory.size
+        bits = PAGE_BITS
+        mask = _PAGE_MASK
+        last = PAGE_SIZE - 3
+        decode = _DECODE
+        stdin = self.stdin
+        stdin_get = stdin.get
+        stdout_put = self.stdout.put
+        cooperative = self._cooperative
+        profile = self._profile
+        if profile is not None:
+            op_counts = profile.op_counts
+            ip_counts = profile.ip_counts
+
+        ip = self._ip
+        rbo = self._rbo
+        try:
+            while True:
+                at = ip & mask
+                if 0 <= ip < capacity and at < last:
+                    code = pages[ip >> bits]
+                else:
+                    # instruction across pages or outside of them, read it like `step()` does
+                    code, at = (memory[ip], memory[ip + 1], memory[ip + 2], memory[ip + 3]), 0
+
+                try:
+                    op, m1, m2, m3 = decode[code[at]]
+                except KeyError:
+                    # codes the table does not know (e.g. 1199 or -1, which halt), are decoded by `step()`
+                    op = code[at] % 100
+                    if op == 3 and cooperative and not stdin:
+                        return WAITING
+
+                    self._ip, self._rbo = ip, rbo
+                    self.step()
+                    ip, rbo = self._ip, self._rbo
+                    over = memory.overflow
+                    capacity = memory.capacity
+                    write_size = memory.size
+
+                    if self._finished:
+                        return FINISHED
+                    if op == 4 and until_output:
+                        return OUTPUT
+                    continue
+
+                if op == 3 and cooperative and not stdin:
+                    return WAITING
+
+                if profile is not None:
+                    op_counts[op] += 1
+                    ip_counts[ip] += 1
+
+                if op == 99:
+                    self._finished = True
+                    if not cooperative:
+                        stdout_put(None)
+                    return FINISHED
+
+                # first parameter, every op except 99 has one
+                a = code[at + 1]
+                if m1 != 1:
+                    if m1 == 2:
+                        a += rbo
+                    if op != 3:
+                        a = pages[a >> bits][a & mask] if 0 <= a < capacity else over.get(a, 0)
+
+                if op == 3:  # READ
+                    des = a
+                    if profile is not None:
+                        ts = perf_counter()
+                        value = stdin_get()
+                        profile.input_wait += perf_counter() - ts
+                    else:
+                        value = stdin_get()
+                    ip += 2
+
+                elif op == 4:  # PRINT
+                    stdout_put(a)
+                    ip += 2
+                    if until_output:
+                        return OUTPUT
+                    continue
+
+                elif op == 9:  # SET RBO
+                    rbo += a
+                    ip += 2
+                    continue
+
+                else:
+                    b = code[at + 2]
+                    if m2 != 1:
+                        if m2 == 2:
+                            b += rbo
+                        b = pages[b >> bits][b & mask] if 0 <= b < capacity else over.get(b, 0)
+
+                    if op == 5:  # JUMP-IF-TRUE
+                        ip = b if a != 0 else ip + 3
+                        continue
+
+                    if op == 6:  # JUMP-IF-FALSE
+                        ip = b if a == 0 else ip + 3
+                        continue
+
+                    if op == 1:  # Addition
+                        value = a + b
+                    elif op == 2:  # Multiply
+                        value = a * b
+                    elif op == 7:  # LESS-THEN
+                        value = int(a < b)
+                    else:  # EQUAL
+                        value = int(a == b)
+
+                    des = code[at + 3]
+                    if m3 == 2:
+                        des += rbo
+                    ip += 4
+
+                if 0 <= des < write_size and owned[des >> bits]:
+                    try:
+                        pages[des >> bits][des & mask] = value
+                        continue
+                    except OverflowError:
+                        pass
+
+                # copy-on-write, grow, sparse or big int
+                memory[des] = value
+                if profile is not None and des >= profile.memory_high_water:
+                    profile.memory_high_water = des + 1
+                over = memory.overflow
+                capacity = memory.capacity
+                write_size = memory.size
+        finally:
+            self._ip = ip
+            self._rbo = rbo
+
     def run_debug(self, log_prefix=""):
         self.DEBUG = True
         self._log_prefix = log_prefix
@@ -173,11 +672,15 @@ class Interpreter:
             self.log(f"  MEM| (IC: {self._ip}, RBO: {self._rbo})", self[:])
 
     def step(self):
+        ip = self._ip
         op_code, *_ = self._read(1, modes="1")
 
         op = op_code() % 100
         modes = str(op_code())[:-2]
 
+        if self._profile is not None:
+            self._profile.count(ip, op)
+
         if op == 1:  # Addition
             p1, p2, des = self._read(3, modes=modes)
             self.log(f"1 ADD| {des} = {p1} + {p2}")
@@ -190,7 +693,12 @@ class Interpreter:
 
         elif op == 3:  # READ
             p1, *_ = self._read(1, modes=modes)
-            value = self.stdin.get()
+            if self._profile is not None:
+                ts = perf_counter()
+                value = self.stdin.get()
+                self._profile.input_wait += perf_counter() - ts
+            else:
+                value = self.stdin.get()
             self.log(f"3 RIN| {p1} = STDIN[{value}]")
             p1(value)
 
@@ -233,10 +741,212 @@ class Interpreter:
         elif op == 99:
             self.log("Stop program")
             self._finished = True
-            self.stdout.put(None)
+            if not self._cooperative:
+                self.stdout.put(None)
         else:
             self.log(f"ERR: Unknown OP Code {op}")
             raise Exception(f"Unknown OP code {op}")
 
     def dump(self) -> Dict[int, int]:
         return self._memory.copy()
+
+    def snapshot(self) -> Snapshot:
+        """
+        Captures memory, instruction pointer, relative base and queued I/O.
+        The memory is shared copy-on-write, so snapshots are cheap.
+        """
+        return Snapshot(
+            memory=self._memory.fork(),
+            ip=self._ip,
+            rbo=self._rbo,
+            finished=self._finished,
+            stdin=_buffered(self.stdin),
+            stdout=_buffered(self.stdout),
+        )
+
+    def restore(self, snapshot: Snapshot):
+        """Resets the interpreter to the snapshot, the snapshot can be restored again later"""
+        self._memory = snapshot.memory.fork()
+        if self._profile is not None:
+            self._profile.memory_high_water = max(self._profile.memory_high_water, len(self._memory))
+        self._ip = snapshot.ip
+        self._rbo = snapshot.rbo
+        self._finished = snapshot.finished
+
+        io_type = Buffer if self._cooperative else Queue
+        self.stdin = io_type()
+        for value in snapshot.stdin:
+            self.stdin.put(value)
+        self.stdout = io_type()
+        for value in snapshot.stdout:
+            self.stdout.put(value)
+
+    def fork(self) -> "Interpreter":
+        """
+        Independent copy of this interpreter, including its state and queued I/O.
+        Memory is shared copy-on-write, so forking at every decision point of a search is cheap.
+        Buffers connected to other interpreters are copied, not shared.
+        """
+        interpreter = Interpreter(
+            [], compiled=self._compiled, cooperative=self._cooperative, profile=self._profile is not None
+        )
+        interpreter.restore(self.snapshot())
+        return interpreter
+
+
+class Scheduler:
+    """
+    Runs cooperative interpreters round-robin in a single thread.
+
+    Interpreters pass values through their `Buffer`s, use `connect()` to chain them.
+    """
+
+    def __init__(self, interpreters: Iterable[Interpreter] = ()):
+        self.interpreters: List[Interpreter] = list(interpreters)
+
+    def add(self, interpreter: Interpreter):
+        self.interpreters.append(interpreter)
+
+    @staticmethod
+    def connect(source: Interpreter, target: Interpreter):
+        """Output of source becomes input of target"""
+        target.stdin = source.stdout
+
+    def run(self) -> bool:
+        """
+        Resumes every interpreter in turn, until all finished or none of them can make progress.
+
+        :return: True if all interpreters finished, False if the remaining ones are waiting for input
+        """
+        progress = True
+        while progress:
+            progress = False
+            for interpreter in self.interpreters:
+                if interpreter.finished:
+                    continue
+
+                had_input = bool(interpreter.stdin)
+                ip = interpreter._ip
+                interpreter.resume()
+                if had_input or interpreter.finished or interpreter._ip != ip:
+                    progress = True
+
+        return all(interpreter.finished for interpreter in self.interpreters)
+
+
+def _put_inputs(interpreter: Interpreter, inputs: Sequence[int]):
+    for value in inputs:
+        interpreter.put(value)
+
+
+def _outputs(interpreter: Interpreter) -> Tuple[int, ...]:
+    return tuple(interpreter.stdout)
+
+
+_batch_template: Optional[Interpreter] = None
+_batch_setup: Callable[[Interpreter, Sequence[int]], None] = _put_inputs
+_batch_result: Callable[[Interpreter], Any] = _outputs
+
+
+def _init_batch_worker(program, setup, result):
+    """Parses the program once per worker process"""
+    global _batch_template, _batch_setup, _batch_result
+    _batch_template = Interpreter(program, compiled=True, cooperative=True)
+    _batch_setup = setup
+    _batch_result = result
+
+
+def _run_batch_job(inputs: Sequence[int]):
+    interpreter = _batch_template.fork()
+    _batch_setup(interpreter, inputs)
+    interpreter.resume()
+    return inputs, _batch_result(interpreter)
+
+
+def run_batch(
+    program: List[int],
+    inputs: Iterable[Sequence[int]],
+    processes: Optional[int] = None,
+    ordered=True,
+    stop: Optional[Callable[[Sequence[int], Any], bool]] = None,
+    setup: Callable[[Interpreter, Sequence[int]], None] = _put_inputs,
+    result: Callable[[Interpreter], Any] = _outputs,
+    chunksize=16,
+):
+    """
+    Runs the program once per input vector, spread over a process pool.
+
+    Each run uses a fork of a compiled, cooperative interpreter, which is built once per worker.
+    A run ends when the program finished or waits for more input.
+
+    :param program: Intcode program
+    :param inputs: input vectors, one run per vector
+    :param processes: pool size, defaults to the cpu count
+    :param ordered: yield results in input order, otherwise as they complete
+    :param stop: predicate `stop(inputs, result)`, ends the batch after the first match
+    :param setup: prepares a run, defaults to putting the vector into stdin (e.g. patch noun and verb instead)
+    :param result: extracts the result of a run, defaults to all stdout values
+    :param chunksize: vectors sent to a worker at once
+    :return: generator of (inputs, result)
+
+    `setup`, `result` and the vectors have to be picklable, so use module level functions.
+    """
+    with Pool(processes, initializer=_init_batch_worker, initargs=(program, setup, result)) as pool:
+        run = pool.imap if ordered else pool.imap_unordered
+        for vector, value in run(_run_batch_job, inputs, chunksize):
+            yield vector, value
+            if stop is not None and stop(vector, value):
+                # leaving the with block terminates the remaining jobs
+                return
+
+
+def benchmark(program: List[int], inputs=(), repeat=3):
+    """
+    Runs the program with both engines and prints instructions per second.
+
+    Both engines have to produce the same stdout and memory dump.
+    """
+    # count executed instructions once, using the step engine
+    counter = Interpreter(program)
+    for value in inputs:
+        counter.put(value)
+    instructions = 0
+    while not counter.finished:
+        counter.step()
+        instructions += 1
+
+    results = {}
+    for name, compiled in (("step", False), ("compiled", True)):
+        best = math.inf
+        for _ in range(repeat):
+            interpreter = Interpreter(program, compiled=compiled)
+            for value in inputs:
+                interpreter.put(value)
+
+            ts = perf_counter()
+            interpreter.run()
+            best = min(best, perf_counter() - ts)
+
+        results[name] = list(interpreter.stdout.queue), interpreter.dump()
+        print(f"{name:>8}: {instructions / best:12,.0f} instructions/sec ({instructions} instructions in {best:2.4f} sec)")
+
+    assert results["step"] == results["compiled"], "Engines produced different results"
+
+
+if __name__ == "__main__":
+    # counts down from the input value, uses relative mode and memory outside of the program
+    countdown = [
+        3, 100,  # [100] = STDIN
+        109, 50,  # RBO = 50
+        1001, 100, -1, 100,  # [100] = [100] - 1
+        22201, 50, 51, 51,  # REL[51] = REL[50] + REL[51]
+        1005, 100, 4,  # IF [100] != 0 GOTO 4
+        4, 100,  # PRINT [100]
+        204, 51,  # PRINT REL[51]
+        99,
+    ]
+    benchmark(countdown, inputs=[100_000])
+
+    # quine from AoC 2019 day 9
+    quine = [109, 1, 204, -1, 1001, 100, 1, 100, 1008, 100, 16, 101, 1006, 101, 0, 99]
+    benchmark(quine)
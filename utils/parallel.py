@@ -0,0 +1,84 @@
+import math
+import operator
+from functools import reduce
+from multiprocessing import Pool, cpu_count
+from time import perf_counter
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence
+
+
+class Chunk(NamedTuple):
+    """
+    Consecutive rows of an input, plus context rows before and after.
+
+    Only the owned rows `lines[before:before + size]` should contribute to the result,
+    the context rows are there for stencils which look at neighbor rows.
+    """
+    lines: Sequence
+    start: int  # index of the first owned row within the whole input
+    before: int  # number of context rows before the owned rows
+    size: int  # number of owned rows
+
+    @property
+    def rows(self) -> range:
+        """Indexes of the owned rows within `lines`"""
+        return range(self.before, self.before + self.size)
+
+    @property
+    def owned(self) -> Sequence:
+        return self.lines[self.before:self.before + self.size]
+
+
+def chunks(lines: Sequence, size: int, overlap=0) -> Iterator[Chunk]:
+    """Splits lines into chunks of `size` owned rows, with up to `overlap` context rows on each side"""
+    for start in range(0, len(lines), size):
+        end = min(start + size, len(lines))
+        first = max(start - overlap, 0)
+        yield Chunk(lines[first:end + overlap], start, start - first, end - start)
+
+
+def map_reduce(
+    func: Callable[[Chunk], Any],
+    lines: Sequence,
+    combine: Callable[[Any, Any], Any] = operator.add,
+    initial: Any = 0,
+    overlap=0,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+):
+    """
+    Applies `func` to chunks of the input across a process pool and combines the results.
+
+    :param func: evaluates a single chunk, only rows in `chunk.rows` should count
+    :param lines: input rows, e.g. the lines of the puzzle input
+    :param combine: reduces two results into one, defaults to addition
+    :param initial: start value of the reduction
+    :param overlap: context rows on each side of a chunk, e.g. 1 for stencils looking at neighbor rows
+    :param processes: pool size, defaults to the cpu count, 1 runs in this process without a pool
+    :param chunk_size: owned rows per chunk, defaults to four chunks per process
+    :return: reduced result
+
+    `func` has to be picklable, so use module level functions.
+    """
+    processes = processes or cpu_count()
+    chunk_size = chunk_size or max(math.ceil(len(lines) / (processes * 4)), 1)
+
+    if processes == 1:
+        return reduce(combine, map(func, chunks(lines, chunk_size, overlap)), initial)
+
+    with Pool(processes) as pool:
+        return reduce(combine, pool.imap(func, chunks(lines, chunk_size, overlap)), initial)
+
+
+def compare(serial: Callable[[Sequence], Any], parallel: Callable[..., Any], lines: Sequence, processes=None, repeat=3):
+    """Prints the best time of a serial and a parallel solver on the same input, both have to give the same answer"""
+    results = {}
+    for name, run in (("serial", serial), ("parallel", lambda data: parallel(data, processes=processes))):
+        best = math.inf
+        for _ in range(repeat):
+            ts = perf_counter()
+            results[name] = run(lines)
+            best = min(best, perf_counter() - ts)
+
+        print(f"{name:>8}: {best:2.4f} sec ({len(lines)} lines)")
+
+    assert results["serial"] == results["parallel"], "Solvers produced different results"
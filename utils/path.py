@@ -1,9 +1,12 @@
+import heapq
 import math
-from collections import deque, UserDict
+from collections import deque, defaultdict
+from collections.abc import Mapping, MutableMapping
 from dataclasses import dataclass
 from io import StringIO
-from operator import attrgetter
-from typing import List, Optional, Set, Dict
+from itertools import count
+from types import MappingProxyType
+from typing import List, Optional, Set, Dict, FrozenSet, Iterable, Any, Tuple
 
 from utils.data import PriorityQueue
 from utils.vector import Vec2, manhattan_neighbors
@@ -77,88 +80,426 @@ class ArrayGraph(GridGraph):
                     yield x, y, c
 
 
-class MapGraph(GridGraph, UserDict):
+class _BoundingBox:
+    """
+    Bounding box (min_x, max_x, min_y, max_y) of a collection of positions.
+
+    The owner has to report every change by `added` and `removed`, so its collection has to stay private.
+    Updated incrementally, recomputed only after an extreme cell was removed.
+    """
+
+    def __init__(self):
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def get(self, cells) -> Tuple[int, int, int, int]:
+        if self._bounds is None:
+            xs = [x for x, _ in cells]
+            ys = [y for _, y in cells]
+            self._bounds = min(xs), max(xs), min(ys), max(ys)
+        return self._bounds
+
+    def added(self, pos: Vec2):
+        """Call after a new position was added to the cells"""
+        if self._bounds is None:
+            return
+
+        x, y = pos
+        min_x, max_x, min_y, max_y = self._bounds
+        self._bounds = min(min_x, x), max(max_x, x), min(min_y, y), max(max_y, y)
+
+    def removed(self, pos: Vec2):
+        """Call after a position was removed from the cells"""
+        if self._bounds is None:
+            return
+
+        x, y = pos
+        min_x, max_x, min_y, max_y = self._bounds
+        if x in (min_x, max_x) or y in (min_y, max_y):
+            self._bounds = None
+
+
+def _render(cells: Iterable[Tuple[Vec2, str]], bounds: Tuple[int, int, int, int], default: str) -> List[str]:
+    """Renders (pos, char) pairs into rows from min_y to max_y in one pass"""
+    min_x, max_x, min_y, max_y = bounds
+    width = max_x - min_x + 1
+    rows = [[default] * width for _ in range(max_y - min_y + 1)]
+    for (x, y), c in cells:
+        rows[y - min_y][x - min_x] = c
+    return ["".join(row) for row in rows]
+
+
+class MapGraph(GridGraph, MutableMapping):
     """
     Graph implementation backed by a map used like Dict[Vec2, Any].
 
     For search algorithms, only not blocked nodes should be added.
+
+    The bounding box is cached and updated on set and delete,
+    so the backing dict is private and every change has to go through the mapping interface.
     """
 
+    def __init__(self, *args, **kwargs):
+        self._cells: Dict[Vec2, Any] = {}
+        self._box = _BoundingBox()
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key: Vec2):
+        return self._cells[key]
+
+    def __setitem__(self, key: Vec2, value):
+        new = key not in self._cells
+        self._cells[key] = value
+        if new:
+            self._box.added(key)
+
+    def __delitem__(self, key: Vec2):
+        del self._cells[key]
+        self._box.removed(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._cells
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    @property
+    def data(self) -> Mapping:
+        """Read-only view of the cells, change them through the mapping interface"""
+        return MappingProxyType(self._cells)
+
+    def copy(self):
+        return self.__class__(self._cells)
+
     def neighbors(self, current: Vec2) -> List:
-        return [n for n in manhattan_neighbors(current) if n in self.data]
+        return [n for n in manhattan_neighbors(current) if n in self._cells]
+
+    @property
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """(min_x, max_x, min_y, max_y)"""
+        return self._box.get(self._cells)
 
     @property
     def max_y(self):
-        return max(map(attrgetter("y"), self.data))
+        return self.bounds[3]
 
     @property
     def min_y(self):
-        return min(map(attrgetter("y"), self.data))
+        return self.bounds[2]
 
     @property
     def max_x(self):
-        return max(map(attrgetter("x"), self.data))
+        return self.bounds[1]
 
     @property
     def min_x(self):
-        return min(map(attrgetter("x"), self.data))
+        return self.bounds[0]
 
     def __repr__(self):
-        text = StringIO()
-
-        for y in range(self.min_y, self.max_y + 1):
-            text.write(f"{y:03.0f} ")
-            for x in range(self.min_x, self.max_x + 1):
-                text.write(self.get(Vec2(x, y), "."))
-            text.write("\n")
-
-        return text.getvalue()
+        return self.to_string()
 
     def to_string(self, y_reversed=False):
         text = StringIO()
 
-        y_range = range(self.min_y, self.max_y + 1)
+        min_y = self.min_y
+        rows = _render(self._cells.items(), self.bounds, ".")
+        y_range = range(min_y, min_y + len(rows))
 
         if y_reversed:
             y_range = reversed(y_range)
 
         for y in y_range:
             text.write(f"{y:03.0f} ")
-            for x in range(self.min_x, self.max_x + 1):
-                text.write(self.get(Vec2(x, y), "."))
+            text.write(rows[y - min_y])
             text.write("\n")
 
         return text.getvalue()
 
+
 class SetGraph(GridGraph):
     """
     Graph implementation backed by a Set[Vec2]
+
+    The bounding box is cached, so the set is private (a copy of the given one),
+    use `add` and `discard` to change it.
     """
 
-    def __init__(self, data: Set[Vec2]):
-        self.data = data
+    def __init__(self, data: Iterable[Vec2]):
+        self._cells: Set[Vec2] = set(data)
+        self._box = _BoundingBox()
+
+    def add(self, pos: Vec2):
+        if pos not in self._cells:
+            self._cells.add(pos)
+            self._box.added(pos)
+
+    def discard(self, pos: Vec2):
+        if pos in self._cells:
+            self._cells.discard(pos)
+            self._box.removed(pos)
+
+    @property
+    def data(self) -> FrozenSet[Vec2]:
+        """Read-only copy of the cells, change them with `add` and `discard`"""
+        return frozenset(self._cells)
+
+    def __contains__(self, pos) -> bool:
+        return pos in self._cells
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
 
     def neighbors(self, current: Vec2) -> List:
-        return [n for n in manhattan_neighbors(current) if n in self.data]
+        return [n for n in manhattan_neighbors(current) if n in self._cells]
+
+    @property
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """(min_x, max_x, min_y, max_y)"""
+        return self._box.get(self._cells)
 
     @property
     def max_y(self):
-        return max(map(attrgetter("y"), self.data))
+        return self.bounds[3]
+
+    @property
+    def min_y(self):
+        return self.bounds[2]
+
+    @property
+    def max_x(self):
+        return self.bounds[1]
+
+    @property
+    def min_x(self):
+        return self.bounds[0]
 
     def __repr__(self):
-        text = StringIO()
+        rows = _render(((pos, ".") for pos in self._cells), self.bounds, "#")
+        return "".join(row + "\n" for row in rows)
 
-        min_x = min(map(attrgetter("x"), self.data))
-        min_y = min(map(attrgetter("y"), self.data))
-        max_x = max(map(attrgetter("x"), self.data))
-        max_y = self.max_y
 
-        for y in range(min_y, max_y + 1):
-            for x in range(min_x, max_x + 1):
-                text.write("." if Vec2(x, y) in self.data else "#")
-            text.write("\n")
+class DenseGraph(GridGraph):
+    """
+    Graph implementation backed by a flat bytearray of width * height chars, stored row by row.
 
-        return text.getvalue()
+    Cells holding one of `walls` are blocked, every other cell is a node.
+    Compared to `MapGraph` this needs one byte per cell and supports integer indices (y * width + x).
+    """
+
+    def __init__(self, width: int, height: int, data: Optional[bytearray] = None, walls: str = "#"):
+        self.width = width
+        self.height = height
+        self.data = bytearray(b"." * (width * height)) if data is None else bytearray(data)
+        self.walls = walls
+        self._blocked = bytes(1 if chr(i) in walls else 0 for i in range(256))
+
+        if len(self.data) != width * height:
+            raise ValueError("Data does not match width and height")
+
+    @staticmethod
+    def from_lines(lines: List[str], walls: str = "#") -> "DenseGraph":
+        width = len(lines[0]) if lines else 0
+        data = "".join(lines).encode()
+        return DenseGraph(width, len(lines), data, walls)
+
+    @staticmethod
+    def from_map(map: Dict[Vec2, str], default: str = ".", walls: str = "#") -> "DenseGraph":
+        """Converts a Dict[Vec2, char] (or MapGraph) with positive coordinates, missing cells are filled with default"""
+        width = max(x for x, _ in map) + 1
+        height = max(y for _, y in map) + 1
+        graph = DenseGraph(width, height, bytearray(default.encode() * (width * height)), walls)
+        for (x, y), c in map.items():
+            graph.data[y * width + x] = ord(c)
+        return graph
+
+    def to_map(self) -> Dict[Vec2, str]:
+        """Dict[Vec2, char] of all cells, as returned by `utils.parse.map_from_lines`"""
+        width = self.width
+        return {Vec2(i % width, i // width): chr(c) for i, c in enumerate(self.data)}
+
+    def to_map_graph(self) -> MapGraph:
+        """MapGraph containing only the not blocked cells"""
+        blocked = self._blocked
+        width = self.width
+        return MapGraph({Vec2(i % width, i // width): chr(c) for i, c in enumerate(self.data) if not blocked[c]})
+
+    def index(self, pos: Vec2) -> int:
+        x, y = pos
+        return y * self.width + x
+
+    def pos(self, index: int) -> Vec2:
+        return Vec2(index % self.width, index // self.width)
+
+    def has(self, pos: Vec2) -> bool:
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, pos: Vec2, default=None):
+        if self.has(pos):
+            return chr(self.data[self.index(pos)])
+        return default
+
+    def __getitem__(self, pos: Vec2) -> str:
+        if not self.has(pos):
+            raise KeyError(pos)
+        return chr(self.data[self.index(pos)])
+
+    def __setitem__(self, pos: Vec2, value: str):
+        if not self.has(pos):
+            raise KeyError(pos)
+        self.data[self.index(pos)] = ord(value)
+
+    def __contains__(self, pos: Vec2) -> bool:
+        """True for not blocked cells, like a MapGraph only containing nodes"""
+        return self.has(pos) and not self._blocked[self.data[self.index(pos)]]
+
+    def row(self, y: int) -> str:
+        return self.data[y * self.width:(y + 1) * self.width].decode()
+
+    def column(self, x: int) -> str:
+        return self.data[x::self.width].decode()
+
+    def mask(self, value: str) -> bytearray:
+        """1 for each cell equal to value, 0 otherwise, same layout as data"""
+        table = bytes(1 if i == ord(value) else 0 for i in range(256))
+        return self.data.translate(table)
+
+    def indices(self, value: str) -> List[int]:
+        """Indices of all cells equal to value"""
+        found = []
+        data = self.data
+        needle = ord(value)
+        i = data.find(needle)
+        while i != -1:
+            found.append(i)
+            i = data.find(needle, i + 1)
+        return found
+
+    def positions(self, value: str) -> List[Vec2]:
+        """Positions of all cells equal to value"""
+        return [self.pos(i) for i in self.indices(value)]
+
+    def neighbor_indices(self, index: int) -> List[int]:
+        """Not blocked manhattan neighbors by index, in the same order as `neighbors()`"""
+        width = self.width
+        data = self.data
+        blocked = self._blocked
+        x = index % width
+        found = []
+        # clockwise, same as manhattan_neighbors: (0, 1), (1, 0), (0, -1), (-1, 0)
+        n = index + width
+        if n < len(data) and not blocked[data[n]]:
+            found.append(n)
+        n = index + 1
+        if x + 1 < width and not blocked[data[n]]:
+            found.append(n)
+        n = index - width
+        if n >= 0 and not blocked[data[n]]:
+            found.append(n)
+        n = index - 1
+        if x > 0 and not blocked[data[n]]:
+            found.append(n)
+        return found
+
+    def neighbors(self, current: Vec2) -> List:
+        return [self.pos(n) for n in self.neighbor_indices(self.index(current))]
+
+    def __repr__(self):
+        return "\n".join(self.row(y) for y in range(self.height)) + "\n"
+
+
+class WeightedGraph(Graph):
+    """
+    Graph implementation with explicit, weighted edges, used like Dict[node, Dict[neighbor, cost]].
+
+    Optionally keeps the cells an edge stands for, see `compress`.
+    """
+
+    def __init__(self):
+        self.edges: Dict[Any, Dict[Any, int]] = defaultdict(dict)
+        self.paths: Dict[Tuple[Any, Any], List] = {}
+
+    def add_edge(self, start, end, cost: int, path: Optional[List] = None):
+        """Adds a directed edge, keeps the cheaper one if it already exists"""
+        if end in self.edges[start] and self.edges[start][end] <= cost:
+            return
+
+        self.edges[start][end] = cost
+        if path is not None:
+            self.paths[(start, end)] = path
+
+    def neighbors(self, current) -> List:
+        return list(self.edges.get(current, ()))
+
+    def cost(self, current, neighbor) -> int:
+        return self.edges[current][neighbor]
+
+    def path(self, start, end) -> Optional[List]:
+        """Cells walked from start to end, excluding start, if paths were kept"""
+        return self.paths.get((start, end))
+
+    def __iter__(self):
+        return iter(self.edges)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def __repr__(self):
+        return f"WeightedGraph({dict(self.edges)})"
+
+
+def compress(graph: Graph, points: Iterable, keep_paths=False) -> WeightedGraph:
+    """
+    Collapses corridors of a graph into weighted edges.
+
+    Nodes of the result are junctions, dead ends and the given points of interest,
+    edges carry the summed `graph.cost` of the corridor between them.
+    Only the parts of the graph connected to the points are explored.
+
+    :param graph: any Graph implementation, neighbors have to be symmetric
+    :param points: points of interest, which always stay nodes
+    :param keep_paths: store the walked cells of every edge, see `WeightedGraph.path`
+    """
+    points = set(points)
+    compressed = WeightedGraph()
+
+    def is_node(cell, neighbors):
+        return cell in points or len(neighbors) != 2
+
+    todo = deque(points)
+    seen = set(points)
+    while todo:
+        start = todo.popleft()
+        compressed.edges[start]  # keep isolated nodes
+
+        for first in graph.neighbors(start):
+            previous, current = start, first
+            cost = graph.cost(start, first)
+            path = [first] if keep_paths else None
+
+            neighbors = graph.neighbors(current)
+            while not is_node(current, neighbors):
+                following = neighbors[0] if neighbors[1] == previous else neighbors[1]
+                cost += graph.cost(current, following)
+                previous, current = current, following
+                if keep_paths:
+                    path.append(current)
+                neighbors = graph.neighbors(current)
+
+            if current == start:
+                continue  # corridor loops back to its start
+
+            compressed.add_edge(start, current, cost, path)
+            if current not in seen:
+                seen.add(current)
+                todo.append(current)
+
+    return compressed
 
 
 def _reconstruct_path(came_from, goal):
@@ -246,3 +587,304 @@ def breadth_first_search(graph: Graph, pos: Vec2, targets: Set[Vec2]) -> PathRes
 
     found.sort(key=lambda p: flip(p))
     return PathResult(_reconstruct_path(came_from, found[0]), came_from)
+
+
+@dataclass
+class DistanceMap:
+    """
+    Result of `dijkstra`, distances of all settled nodes to their nearest source.
+    Can be cached and queried for any settled node without another search.
+    """
+
+    distances: Dict[Any, int]
+    came_from: Dict[Any, Any]
+    complete: bool
+    """True if every reachable node was settled, False if an early stop left reachable nodes unsettled"""
+
+    def __getitem__(self, node) -> int:
+        return self.distances[node]
+
+    def __contains__(self, node) -> bool:
+        return node in self.distances
+
+    def get(self, node, default=None) -> Optional[int]:
+        return self.distances.get(node, default)
+
+    def source(self, node):
+        """Nearest source of the node"""
+        while self.came_from[node] is not None:
+            node = self.came_from[node]
+        return node
+
+    def path(self, node) -> Optional[List]:
+        """Path from the nearest source to node, excluding the source, None if node was not reached"""
+        if node not in self.came_from:
+            return None
+
+        path = []
+        while self.came_from[node] is not None:
+            path.append(node)
+            node = self.came_from[node]
+        path.reverse()
+        return path
+
+
+def dijkstra(graph: Graph, sources: Iterable, targets: Optional[Iterable] = None) -> DistanceMap:
+    """
+    Dijkstra's algorithm using `graph.cost`, starting from all sources at once.
+
+    Stops as soon as all targets are settled, without (or with empty) targets the whole reachable graph is explored.
+    """
+    frontier = []
+    order = count()  # nodes do not have to be comparable
+    distances = {}
+    came_from = {}
+    best = {}
+
+    for source in sources:
+        best[source] = 0
+        came_from[source] = None
+        heapq.heappush(frontier, (0, next(order), source))
+
+    remaining = set(targets) if targets is not None else None
+    if not remaining:
+        remaining = None  # no targets, explore everything
+
+    complete = True
+    while frontier:
+        cost, _, current = heapq.heappop(frontier)
+        if current in distances:
+            continue
+
+        distances[current] = cost
+        neighbors = graph.neighbors(current)
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                # the graph is only exhausted, if nothing is left to settle
+                complete = all(node in distances for _, _, node in frontier)
+                complete = complete and all(neighbor in distances for neighbor in neighbors)
+                break
+
+        for neighbor in neighbors:
+            if neighbor in distances:
+                continue
+
+            new_cost = cost + graph.cost(current, neighbor)
+            if neighbor not in best or new_cost < best[neighbor]:
+                best[neighbor] = new_cost
+                came_from[neighbor] = current
+                heapq.heappush(frontier, (new_cost, next(order), neighbor))
+
+    return DistanceMap(
+        distances=distances,
+        came_from={node: came_from[node] for node in distances},
+        complete=complete,
+    )
+
+
+def pairwise_distances(graph: Graph, points: Iterable) -> Dict[Tuple[Any, Any], int]:
+    """
+    Distances between all pairs of points, using one `dijkstra` per point.
+    Unreachable pairs are missing.
+    """
+    points = list(points)
+    result = {}
+    for point in points:
+        others = [p for p in points if p != point]
+        if not others:
+            continue
+
+        distance_map = dijkstra(graph, [point], others)
+        for other in others:
+            if other in distance_map:
+                result[(point, other)] = distance_map[other]
+    return result
+
+
+def _reconstruct_index_path(graph: "DenseGraph", parent: List[int], goal: int) -> List[Vec2]:
+    path = []
+    current = goal
+    while parent[current] >= 0:
+        path.append(graph.pos(current))
+        current = parent[current]
+    path.reverse()
+    return path
+
+
+class IndexCameFrom(Mapping):
+    """
+    Read-only Dict[Vec2, Vec2] view on the parent list of the indexed searches.
+    Positions are only created on access, so searches do not pay for the full came_from dict.
+    """
+
+    def __init__(self, graph: DenseGraph, parent: List[int], start: int):
+        self._graph = graph
+        self._parent = parent
+        self._start = start
+
+    def __getitem__(self, pos: Vec2) -> Optional[Vec2]:
+        if self._graph.has(pos):
+            index = self._graph.index(pos)
+            if index == self._start:
+                return None
+            if self._parent[index] >= 0:
+                return self._graph.pos(self._parent[index])
+        raise KeyError(pos)
+
+    def __iter__(self):
+        pos = self._graph.pos
+        yield pos(self._start)
+        for i, p in enumerate(self._parent):
+            if p >= 0:
+                yield pos(i)
+
+    def __len__(self):
+        return len(self._parent) - self._parent.count(-1) + 1
+
+
+def a_star_search_indexed(graph: DenseGraph, start: Vec2, goal: Vec2) -> PathResult:
+    """
+    Same as `a_star_search`, but specialised for a DenseGraph.
+
+    Works on integer node ids (y * width + x) with preallocated distance and parent lists,
+    results and tie-breaking are identical to `a_star_search`. `came_from` is a lazy `IndexCameFrom` view.
+    """
+    if start == goal:
+        return PathResult([], {})
+
+    width, height = graph.width, graph.height
+    size = width * height
+    data = graph.data
+    blocked = graph._blocked
+    gx, gy = goal
+
+    start_id = graph.index(start)
+    goal_id = graph.index(goal)
+    dist = [-1] * size
+    parent = [-1] * size
+    dist[start_id] = 0
+
+    # heap entries encode (priority, x, y) in one int, which matches the ordering of (priority, Vec2)
+    frontier = [start.x * height + start.y]
+    pop, push = heapq.heappop, heapq.heappush
+
+    while frontier:
+        priority, key = divmod(pop(frontier), size)
+        x, y = divmod(key, height)
+        current = y * width + x
+
+        if current == goal_id:
+            return PathResult(_reconstruct_index_path(graph, parent, goal_id), IndexCameFrom(graph, parent, start_id))
+
+        new_cost = dist[current] + 1
+        if priority > new_cost - 1 + abs(gx - x) + abs(gy - y):
+            continue  # outdated entry, the node was already expanded with a lower cost
+
+        # manhattan_neighbors order: (0, 1), (1, 0), (0, -1), (-1, 0)
+        for n, nx, ny, valid in (
+            (current + width, x, y + 1, y + 1 < height),
+            (current + 1, x + 1, y, x + 1 < width),
+            (current - width, x, y - 1, y > 0),
+            (current - 1, x - 1, y, x > 0),
+        ):
+            if not valid or blocked[data[n]]:
+                continue
+
+            # ties on cost prefer the parent with the lower (y, x), like `a_star_search`
+            old_cost = dist[n]
+            if old_cost == -1 or new_cost < old_cost or (new_cost == old_cost and current < parent[n]):
+                dist[n] = new_cost
+                parent[n] = current
+                push(frontier, (new_cost + abs(gx - nx) + abs(gy - ny)) * size + nx * height + ny)
+
+    return PathResult(None, IndexCameFrom(graph, parent, start_id))
+
+
+def breadth_first_search_indexed(graph: DenseGraph, pos: Vec2, targets: Set[Vec2]) -> PathResult:
+    """
+    Same as `breadth_first_search`, but specialised for a DenseGraph.
+
+    Works on integer node ids (y * width + x) with a preallocated parent list,
+    results and tie-breaking are identical to `breadth_first_search`. `came_from` is a lazy `IndexCameFrom` view.
+    """
+    if pos in targets:
+        return PathResult([], {})
+
+    width, height = graph.width, graph.height
+    data = graph.data
+    blocked = graph._blocked
+
+    start_id = graph.index(pos)
+    target_ids = {graph.index(t) for t in targets if graph.has(t)}
+    parent = [-1] * (width * height)
+    seen = bytearray(width * height)
+    seen[start_id] = 1
+
+    todo = deque()
+    todo.append((0, start_id))
+
+    found = []
+    max_depth = math.inf
+    while todo:
+        depth, current = todo.popleft()
+        if depth > max_depth:
+            break
+
+        x = current % width
+        for n, valid in (
+            (current + width, current + width < len(data)),
+            (current + 1, x + 1 < width),
+            (current - width, current >= width),
+            (current - 1, x > 0),
+        ):
+            if not valid or seen[n] or blocked[data[n]]:
+                continue
+
+            seen[n] = 1
+            parent[n] = current
+            todo.append((depth + 1, n))
+
+            if n in target_ids:
+                max_depth = min(depth, max_depth)
+                found.append(n)
+
+    if not found:
+        return PathResult(None, IndexCameFrom(graph, parent, start_id))
+
+    # ids are ordered by (y, x), same as sorting by flip(pos)
+    found.sort()
+    return PathResult(_reconstruct_index_path(graph, parent, found[0]), IndexCameFrom(graph, parent, start_id))
+
+
+if __name__ == "__main__":
+    import random
+    from time import perf_counter
+
+    random.seed(2023)
+    size = 400
+    lines = ["".join("#" if random.random() < 0.25 else "." for _ in range(size)) for _ in range(size)]
+    start, goal = Vec2(0, 0), Vec2(size - 1, size - 1)
+    lines[0] = "." + lines[0][1:]
+    lines[-1] = lines[-1][:-1] + "."
+
+    dense = DenseGraph.from_lines(lines)
+    graph = dense.to_map_graph()
+
+    for name, search, indexed, args in (
+        ("A*", a_star_search, a_star_search_indexed, (start, goal)),
+        ("BFS", breadth_first_search, breadth_first_search_indexed, (start, {goal, Vec2(size // 2, size - 1)})),
+    ):
+        # best of several runs, single runs vary a lot
+        t_graph = t_indexed = math.inf
+        for _ in range(5):
+            ts = perf_counter()
+            expected = search(graph, *args)
+            t_graph = min(t_graph, perf_counter() - ts)
+
+            ts = perf_counter()
+            result = indexed(dense, *args)
+            t_indexed = min(t_indexed, perf_counter() - ts)
+
+        assert result == expected, f"{name} results differ"
+        print(f"{name:>4}: MapGraph {t_graph:2.4f} sec, indexed {t_indexed:2.4f} sec ({t_graph / t_indexed:2.1f}x)")
@@ -0,0 +1,122 @@
+import mmap
+import re
+from array import array
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Union
+
+_INT = re.compile(rb"-?\d+")
+
+
+def ints(data) -> List[int]:
+    """All integers in a bytes like object (bytes, memoryview, mmap), including negative ones"""
+    return list(map(int, _INT.findall(data)))
+
+
+class MappedInput:
+    """
+    Puzzle input as memory mapped file, lines are read lazily and without copying the file.
+
+    - `views` yields zero-copy memoryviews, which must be released before the input is closed
+    - `__iter__` yields each line as bytes, `lines` as str (one small copy per line)
+    - `ints` extracts integers straight from the mapped bytes
+
+    Line endings (\\n or \\r\\n) are stripped, a trailing newline does not produce an empty line.
+    """
+
+    def __init__(self, file: Union[str, Path, IO]):
+        if isinstance(file, (str, Path)):
+            with open(file, "rb") as f:
+                self._buffer = self._map(f)
+        else:
+            self._buffer = self._map(file)
+
+        self._offsets: Optional[array] = None
+
+    @staticmethod
+    def _map(file: IO):
+        try:
+            fileno = file.fileno()
+        except (AttributeError, OSError):
+            # in memory files (e.g. io.StringIO) can not be mapped
+            data = file.read()
+            return data.encode() if isinstance(data, str) else data
+
+        try:
+            return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can not be mapped
+            return b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    @property
+    def buffer(self):
+        """Whole input as bytes like object"""
+        return self._buffer
+
+    def _spans(self) -> Iterator[tuple]:
+        buffer = self._buffer
+        size = len(buffer)
+        start = 0
+        while start < size:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = size
+            stop = end - 1 if end > start and buffer[end - 1] == 13 else end  # \r
+            yield start, stop
+            start = end + 1
+
+    def views(self) -> Iterator[memoryview]:
+        """Lines as zero-copy memoryviews into the mapped file"""
+        with memoryview(self._buffer) as view:
+            for start, end in self._spans():
+                yield view[start:end]
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer = self._buffer
+        for start, end in self._spans():
+            yield buffer[start:end]
+
+    def lines(self, encoding="utf-8") -> Iterator[str]:
+        buffer = self._buffer
+        for start, end in self._spans():
+            yield buffer[start:end].decode(encoding)
+
+    @property
+    def offsets(self) -> array:
+        """Start offset of every line (plus the end of the input), build once on first use"""
+        if self._offsets is None:
+            offsets = array("q")
+            for start, _ in self._spans():
+                offsets.append(start)
+            offsets.append(len(self._buffer))
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        """Single line as bytes, random access using `offsets`"""
+        offsets = self.offsets
+        if index < 0:
+            index += len(offsets) - 1
+        if not 0 <= index < len(offsets) - 1:
+            raise IndexError(index)
+
+        start, end = offsets[index], offsets[index + 1]
+        line = self._buffer[start:end]
+        return line.rstrip(b"\r\n")
+
+    def ints(self) -> Iterator[int]:
+        """All integers of the input, in order"""
+        for match in _INT.finditer(self._buffer):
+            yield int(match.group())
@@ -0,0 +1,18 @@
+from utils.matcher import AhoCorasick
+
+
+def test_first_last():
+    matcher = AhoCorasick({"one": 1, "two": 2, "1": 1, "2": 2})
+    assert matcher.first_last("xtwonex") == (2, 1)
+    assert matcher.first_last("xx") == (None, None)
+    assert list(matcher.finditer("twone")) == [(0, 2), (2, 1)]
+
+
+def test_same_start_prefers_longest():
+    matcher = AhoCorasick({"b": 2, "bcb": 5})
+    assert matcher.first("daabcbcbc") == 5
+    assert matcher.last("daabcbcbc") == 2
+    assert matcher.first("bcbaa", start=1) == 2
+
+    matcher = AhoCorasick({"a": 1, "ab": 3})
+    assert matcher.first_last("xabx") == (3, 3)
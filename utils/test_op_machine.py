@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+
+from utils.op_machine import PAGE_SIZE, Interpreter, Memory, Scheduler, run_batch
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_dump_ends_at_highest_used_cell(compiled):
+    interpreter = Interpreter([1101, 1, 1, 100, 1101, 1, 1, 101, 99], compiled=compiled)
+    interpreter.run()
+
+    memory = interpreter.dump()
+    assert len(memory) == 102
+    assert memory[100] == memory[101] == 2
+    assert len(interpreter[:]) == 102
+
+
+def test_memory_size_excludes_growth():
+    memory = Memory([1, 2, 3])
+    memory[10] = 4
+
+    assert len(memory) == 11
+    assert memory.usage()["cells"] == 11
+    assert memory.usage()["capacity"] >= 11
+    assert memory[5:12] == (0, 0, 0, 0, 0, 4, 0)
+
+
+@pytest.mark.parametrize("program", [
+    [1105, 1, -3, 104, 7, 99],  # jump to a negative address
+    [104],  # operand after the end of the program
+    [1101, 2, 3, 7, 1105, 1, 8, 0, 104, 5, 99],  # instruction within the last three cells
+    [104, 1, 1199, 104, 2],  # halt with mode digits
+    [104, 1, -1, 104, 2],  # negative halt
+    [10004, 7, 21004, 0, 99],  # mode digits beyond the parameters
+    [304, 1, 99],  # unknown param mode
+    [104, 1, 42],  # unknown op code
+])
+def test_engines_fetch_outside_memory_alike(program):
+    results = []
+    for compiled in (False, True):
+        interpreter = Interpreter(program, compiled=compiled, cooperative=True)
+        try:
+            interpreter.resume()
+            results.append(("ok", tuple(interpreter.stdout), interpreter.dump()))
+        except Exception as e:
+            results.append(("error", str(e)))
+
+    assert results[0] == results[1]
+
+
+def test_fork_copies_only_written_pages():
+    memory = Memory(list(range(3 * PAGE_SIZE)))
+    memory[5 * PAGE_SIZE] = 1  # sparse limit is above, so this adds pages
+    memory.sparse_limit = 6 * PAGE_SIZE
+    memory[-1] = 7  # sparse cell
+    fork = memory.fork()
+
+    fork[PAGE_SIZE + 1] = -1
+    fork[-1] = 8
+    assert memory[PAGE_SIZE + 1] == PAGE_SIZE + 1
+    assert memory[-1] == 7
+    assert fork.pages[0] is memory.pages[0]
+    assert fork.pages[1] is not memory.pages[1]
+    assert fork.usage()["shared_pages"] == len(fork.pages) - 1
+
+    memory[2] = 100
+    assert fork[2] == 2
+    assert memory.pages[1] is not fork.pages[1]
+    assert memory.usage()["shared_pages"] == len(memory.pages) - 1
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_fork_isolation(compiled):
+    # adds each input to [100] and prints the sum
+    program = [3, 101, 1, 100, 101, 100, 4, 100, 1105, 1, 0]
+    interpreter = Interpreter(program, compiled=compiled, cooperative=True)
+    interpreter.put(1)
+    interpreter.resume()
+    fork = interpreter.fork()
+    snapshot = interpreter.snapshot()
+
+    fork.put(10)
+    fork.resume()
+    interpreter.put(2)
+    interpreter.resume()
+    assert list(fork.stdout) == [1, 11]
+    assert list(interpreter.stdout) == [1, 3]
+
+    interpreter.restore(snapshot)
+    interpreter.put(5)
+    interpreter.resume()
+    assert list(interpreter.stdout) == [1, 6]
+    assert interpreter[100] == 6 and fork[100] == 11
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_profile_counts(compiled):
+    program = [1101, 1, 1, 100, 1101, 1, 1, 101, 99]
+    interpreter = Interpreter(program, compiled=compiled, profile=True)
+    interpreter.run()
+
+    profile = interpreter.profile
+    assert profile.instructions == 3
+    assert dict(profile.op_counts) == {1: 2, 99: 1}
+    assert dict(profile.ip_counts) == {0: 1, 4: 1, 8: 1}
+    assert profile.memory_high_water == 102
+    assert profile.to_dict()["ops"] == {"ADD": 2, "END": 1}
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_profile_memory_high_water_survives_restore(compiled):
+    # [500] = STDIN, [0] = STDIN
+    program = [3, 500, 3, 0, 99]
+    interpreter = Interpreter(program, compiled=compiled, cooperative=True, profile=True)
+    snapshot = interpreter.snapshot()
+    interpreter.put(500)
+    interpreter.put(200)
+    interpreter.resume()
+
+    interpreter.restore(snapshot)
+    assert interpreter.profile.memory_high_water == 501
+    assert interpreter.profile.op_counts[3] == 2
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_aget_waits_for_aput(compiled):
+    # prints every input doubled
+    program = [3, 100, 1002, 100, 2, 100, 4, 100, 1105, 1, 0]
+    interpreter = Interpreter(program, compiled=compiled, cooperative=True)
+    resumes = []
+    resume = interpreter.resume
+    interpreter.resume = lambda *args, **kwargs: resumes.append(1) or resume(*args, **kwargs)
+
+    async def scenario():
+        consumer = asyncio.create_task(interpreter.aget())
+        for _ in range(100):
+            await asyncio.sleep(0)
+        # the consumer is parked on the event, not polling
+        assert len(resumes) == 1
+
+        await interpreter.aput(21)
+        return await consumer
+
+    assert asyncio.run(scenario()) == 42
+
+
+def test_scheduler_feedback_loop():
+    # amplifier feedback loop, AoC 2019 day 7 part 2 example
+    program = [3, 26, 1001, 26, -4, 26, 3, 27, 1002, 27, 2, 27, 1, 27, 26, 27, 4, 27, 1001, 28, -1, 28, 1005, 28, 6, 99, 0,
+               0, 5]
+    amplifiers = [Interpreter(program, compiled=True, cooperative=True) for _ in range(5)]
+    for source, target in zip(amplifiers, amplifiers[1:] + amplifiers[:1]):
+        Scheduler.connect(source, target)
+    for amplifier, phase in zip(amplifiers, [9, 8, 7, 6, 5]):
+        amplifier.put(phase)
+    amplifiers[0].put(0)
+
+    assert Scheduler(amplifiers).run()
+    assert amplifiers[0].stdin[-1] == 139629729
+
+
+def test_scheduler_reports_deadlock():
+    # waits for input nobody provides
+    assert not Scheduler([Interpreter([3, 0, 99], cooperative=True)]).run()
+
+
+# [11] = STDIN, [12] = STDIN, PRINT [11] + [12]
+ADDER = [3, 11, 3, 12, 1, 11, 12, 13, 4, 13, 99]
+
+
+def test_run_batch_unordered():
+    inputs = [(a, b) for a in range(5) for b in range(5)]
+
+    results = dict(run_batch(ADDER, inputs, processes=2, ordered=False, chunksize=2))
+    assert results == {(a, b): (a + b,) for a, b in inputs}
+
+
+def test_run_batch_stop():
+    inputs = [(a, 1) for a in range(100)]
+
+    results = list(run_batch(ADDER, inputs, processes=2, stop=lambda vector, outputs: outputs == (6,)))
+    assert results == [((a, 1), (a + 1,)) for a in range(6)]
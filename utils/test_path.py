@@ -0,0 +1,141 @@
+import pytest
+
+from utils.path import (
+    DenseGraph,
+    MapGraph,
+    SetGraph,
+    a_star_search,
+    a_star_search_indexed,
+    breadth_first_search,
+    breadth_first_search_indexed,
+    compress,
+    dijkstra,
+    pairwise_distances,
+)
+from utils.vector import Vec2
+
+
+def line(length):
+    return SetGraph({Vec2(x, 0) for x in range(length)})
+
+
+def test_set_graph_bounds():
+    cells = {Vec2(0, 0), Vec2(5, 5)}
+    graph = SetGraph(cells)
+    assert graph.bounds == (0, 5, 0, 5)
+
+    cells.add(Vec2(9, 9))  # the graph keeps its own copy
+    graph.discard(Vec2(5, 5))
+    graph.add(Vec2(1, 1))
+    assert graph.bounds == (0, 1, 0, 1)
+
+    graph.add(Vec2(-1, 3))
+    assert graph.bounds == (-1, 1, 0, 3)
+    assert len(graph) == 3 and Vec2(-1, 3) in graph
+    assert graph.data == {Vec2(0, 0), Vec2(1, 1), Vec2(-1, 3)}
+    with pytest.raises(AttributeError):
+        graph.data.add(Vec2(9, 9))
+
+
+def test_map_graph_bounds():
+    graph = MapGraph({Vec2(0, 0): "a", Vec2(5, 5): "b"})
+    assert graph.bounds == (0, 5, 0, 5)
+
+    del graph[Vec2(5, 5)]
+    graph[Vec2(1, 1)] = "c"
+    assert graph.bounds == (0, 1, 0, 1)
+
+    graph.update({Vec2(2, -1): "d"})
+    assert graph.bounds == (0, 2, -1, 1)
+    assert graph.copy() == graph
+    assert graph.data[Vec2(2, -1)] == "d"
+    with pytest.raises(TypeError):
+        graph.data[Vec2(9, 9)] = "e"
+    assert graph.to_string() == "-01 ..d\n000 a..\n001 .c.\n"
+
+
+def test_dijkstra_without_targets():
+    graph = line(4)
+    for targets in (None, []):
+        distance_map = dijkstra(graph, [Vec2(0, 0)], targets)
+        assert distance_map.complete
+        assert distance_map[Vec2(3, 0)] == 3
+
+
+def test_dijkstra_stops_at_targets():
+    distance_map = dijkstra(line(4), [Vec2(0, 0)], [Vec2(1, 0)])
+    assert not distance_map.complete
+    assert Vec2(3, 0) not in distance_map
+
+
+def test_dijkstra_complete_when_last_node_is_target():
+    distance_map = dijkstra(line(4), [Vec2(0, 0)], [Vec2(3, 0)])
+    assert distance_map.complete
+    assert distance_map.path(Vec2(3, 0)) == [Vec2(1, 0), Vec2(2, 0), Vec2(3, 0)]
+
+
+MAZE = [
+    "#########",
+    "#...#...#",
+    "#.#.#.#.#",
+    "#.#...#.#",
+    "#.#####.#",
+    "#.......#",
+    "#########",
+]
+
+
+def test_dense_graph():
+    graph = DenseGraph.from_lines(MAZE)
+    assert (graph.width, graph.height) == (9, 7)
+    assert graph[Vec2(1, 1)] == "."
+    assert Vec2(1, 1) in graph and Vec2(0, 0) not in graph
+    assert graph.neighbors(Vec2(1, 1)) == [Vec2(1, 2), Vec2(2, 1)]
+    assert graph.to_map_graph().neighbors(Vec2(1, 1)) == graph.neighbors(Vec2(1, 1))
+    assert DenseGraph.from_map(graph.to_map()).data == graph.data
+    assert repr(graph) == "".join(line + "\n" for line in MAZE)
+
+
+def test_compress_keeps_distances():
+    graph = DenseGraph.from_lines(MAZE)
+    points = [Vec2(1, 1), Vec2(7, 1), Vec2(5, 3)]
+    compressed = compress(graph, points, keep_paths=True)
+
+    full = dijkstra(graph, [Vec2(1, 1)])
+    short = dijkstra(compressed, [Vec2(1, 1)])
+    for point in points:
+        assert short[point] == full[point]
+
+    # the maze is a single loop, so only the points of interest stay nodes
+    assert set(compressed) == set(points)
+    assert compressed.path(Vec2(5, 3), Vec2(7, 1)) == [Vec2(5, 2), Vec2(5, 1), Vec2(6, 1), Vec2(7, 1)]
+
+
+def test_pairwise_distances():
+    graph = DenseGraph.from_lines(MAZE)
+    points = [Vec2(1, 1), Vec2(7, 1), Vec2(5, 1)]
+    distances = pairwise_distances(graph, points)
+    assert distances[(Vec2(1, 1), Vec2(7, 1))] == 10
+    assert distances[(Vec2(7, 1), Vec2(1, 1))] == 10
+    assert distances[(Vec2(1, 1), Vec2(5, 1))] == 8
+    assert len(distances) == 6
+
+    assert pairwise_distances(graph, [Vec2(1, 1)]) == {}
+
+
+def test_indexed_searches_match_generic():
+    dense = DenseGraph.from_lines(MAZE)
+    graph = dense.to_map_graph()
+    start = Vec2(1, 1)
+
+    for goal in (Vec2(7, 1), Vec2(5, 3), Vec2(1, 5), start):
+        expected = a_star_search(graph, start, goal)
+        result = a_star_search_indexed(dense, start, goal)
+        assert result.path == expected.path
+        assert dict(result.came_from) == expected.came_from
+
+    for targets in ({Vec2(7, 1), Vec2(1, 5)}, {Vec2(5, 1)}, {start}, {Vec2(0, 0)}):
+        expected = breadth_first_search(graph, start, targets)
+        result = breadth_first_search_indexed(dense, start, targets)
+        assert result.path == expected.path
+        assert dict(result.came_from) == expected.came_from
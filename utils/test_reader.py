@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from utils.reader import MappedInput, ints
+
+
+@pytest.fixture
+def puzzle_file(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_bytes(b"...#......\r\n.-12..3...\n\n#.........\n")
+    return path
+
+
+def test_lines(puzzle_file):
+    with MappedInput(puzzle_file) as puzzle:
+        assert list(puzzle.lines()) == ["...#......", ".-12..3...", "", "#........."]
+        assert list(puzzle) == [line.encode() for line in puzzle.lines()]
+        assert [bytes(view) for view in puzzle.views()] == list(puzzle)
+
+
+def test_random_access(puzzle_file):
+    with MappedInput(puzzle_file) as puzzle:
+        assert len(puzzle) == 4
+        assert puzzle[0] == b"...#......"
+        assert puzzle[-1] == b"#........."
+        with pytest.raises(IndexError):
+            puzzle[4]
+
+
+def test_ints(puzzle_file):
+    with MappedInput(puzzle_file) as puzzle:
+        assert list(puzzle.ints()) == [-12, 3]
+        assert ints(puzzle.buffer) == [-12, 3]
+
+
+def test_open_file_and_in_memory(puzzle_file):
+    with puzzle_file.open() as f, MappedInput(f) as puzzle:
+        assert len(puzzle) == 4
+
+    with MappedInput(io.StringIO("a\nb")) as puzzle:
+        assert list(puzzle.lines()) == ["a", "b"]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.touch()
+    with MappedInput(path) as puzzle:
+        assert len(puzzle) == 0
+        assert list(puzzle.lines()) == []
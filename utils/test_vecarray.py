@@ -0,0 +1,41 @@
+from itertools import combinations
+
+import numpy as np
+
+from utils.vecarray import VecArray
+from utils.vector import Vec2, Vec3
+
+VECS = [Vec2(0, 0), Vec2(3, -1), Vec2(-2, 4), Vec2(5, 5)]
+
+
+def test_rotate_degree_matches_vec2():
+    vecs = VecArray.from_vecs(VECS)
+    for degree in (0, 90, 180, 270, -90, 450):
+        assert vecs.rotate_degree(degree).to_vecs() == [v.rotate_degree(degree) for v in VECS]
+
+
+def test_rotate_degree_3d():
+    vecs = VecArray.from_vecs([Vec3(1, 2, 3)])
+    assert vecs.rotate_degree(90, axis="z").to_vecs() == [Vec3(2, -1, 3)]
+    assert vecs.rotate_degree(90, axis="x").to_vecs() == [Vec3(1, 3, -2)]
+    assert vecs.rotate_degree(360, axis="y").to_vecs() == [Vec3(1, 2, 3)]
+
+
+def test_chebyshev_sum():
+    for vecs in (VECS, [Vec3(0, 0, 0), Vec3(1, -4, 2), Vec3(3, 3, -3)]):
+        expected = sum(max(abs(a - b) for a, b in zip(u, v)) for u, v in combinations(vecs, 2))
+        assert VecArray.from_vecs(vecs).chebyshev_sum(chunk_size=2) == expected
+
+
+def test_nearest():
+    vecs = VecArray.from_vecs(VECS)
+    points = VecArray.from_vecs([Vec2(1, 0), Vec2(4, 4), Vec2(-2, 3)])
+
+    indices, distances = vecs.nearest(points, chunk_size=2)
+    assert indices.tolist() == [0, 3, 2]
+    assert distances.tolist() == [1, 2, 1]
+
+    indices, distances = vecs.nearest(points, metric="chebyshev")
+    assert indices.tolist() == [0, 3, 2]
+    assert distances.tolist() == [1, 1, 1]
+    assert isinstance(distances, np.ndarray)
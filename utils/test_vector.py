@@ -0,0 +1,31 @@
+import pytest
+
+from utils.vector import Vec2, VecGrid, manhattan_neighbors, neigbors, neigbors_tl_br
+
+
+def test_neigbors_tl_br():
+    assert list(neigbors_tl_br(Vec2(1, 1))) == [
+        Vec2(0, 0), Vec2(1, 0), Vec2(2, 0),
+        Vec2(0, 1), Vec2(2, 1),
+        Vec2(0, 2), Vec2(1, 2), Vec2(2, 2),
+    ]
+    assert list(neigbors_tl_br(Vec2(1, 1), include_center=True))[3:6] == [Vec2(0, 1), Vec2(1, 1), Vec2(2, 1)]
+
+
+def test_vec_grid_neighbors():
+    grid = VecGrid(3, 3)
+    for pos in grid:
+        assert grid.vec(*pos) is grid.vec(*pos)
+        assert list(grid.manhattan_neighbors(pos)) == [n for n in manhattan_neighbors(pos) if n in grid]
+        assert list(grid.neigbors(pos)) == [n for n in neigbors(pos) if n in grid]
+
+
+@pytest.mark.parametrize("pos", [Vec2(3, 0), Vec2(-1, 0), Vec2(0, 3), Vec2(0, -1)])
+def test_vec_grid_outside(pos):
+    grid = VecGrid(3, 3)
+    with pytest.raises(KeyError):
+        grid.vec(*pos)
+    with pytest.raises(KeyError):
+        grid.manhattan_neighbors(pos)
+    with pytest.raises(KeyError):
+        grid.neigbors(pos)
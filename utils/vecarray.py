@@ -0,0 +1,143 @@
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+from utils.vector import Vec2, Vec3
+
+_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def _axis_sum(values: np.ndarray) -> int:
+    """Sum of |a - b| over all unordered pairs, using sorted values and their ranks"""
+    values = np.sort(values)
+    n = len(values)
+    ranks = np.arange(n, dtype=np.int64)
+    return int(np.sum(values * (2 * ranks - n + 1)))
+
+
+class VecArray:
+    """
+    N x 2 or N x 3 integer array of coordinates, for batch operations on many Vec2/Vec3.
+
+    Operations return new VecArray instances.
+    """
+
+    def __init__(self, data: Union[np.ndarray, Iterable[Tuple[int, ...]]]):
+        self.data = np.asarray(data, dtype=np.int64)
+        if self.data.size == 0:
+            self.data = self.data.reshape(0, 2)
+        if self.data.ndim != 2 or self.data.shape[1] not in (2, 3):
+            raise ValueError("VecArray requires N x 2 or N x 3 coordinates")
+
+    @staticmethod
+    def from_vecs(vecs: Iterable[Union[Vec2, Vec3]]) -> "VecArray":
+        return VecArray(list(vecs))
+
+    def to_vecs(self) -> List[Union[Vec2, Vec3]]:
+        vec = Vec2 if self.dim == 2 else Vec3
+        return [vec(*row) for row in self.data.tolist()]
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, index) -> Union[Vec2, Vec3]:
+        vec = Vec2 if self.dim == 2 else Vec3
+        return vec(*self.data[index].tolist())
+
+    def __iter__(self):
+        return iter(self.to_vecs())
+
+    def __repr__(self):
+        return f"VecArray({self.data.tolist()})"
+
+    def translate(self, offset: Tuple[int, ...]) -> "VecArray":
+        return VecArray(self.data + np.asarray(offset, dtype=np.int64))
+
+    def rotate_degree(self, degree: int, axis="z") -> "VecArray":
+        """
+        Rotate clockwise in steps of 90 degree, same as `Vec2.rotate_degree`.
+        3D vectors are rotated around the given axis.
+        """
+        if degree % 90:
+            raise ValueError("Only multiples of 90 degree are supported")
+
+        if self.dim == 2:
+            a, b = 0, 1
+        else:
+            a, b = [i for i in range(3) if i != _AXES[axis]]
+
+        data = self.data.copy()
+        for _ in range(degree // 90 % 4):
+            data[:, a], data[:, b] = data[:, b].copy(), -data[:, a]
+        return VecArray(data)
+
+    def min(self) -> Union[Vec2, Vec3]:
+        vec = Vec2 if self.dim == 2 else Vec3
+        return vec(*self.data.min(axis=0).tolist())
+
+    def max(self) -> Union[Vec2, Vec3]:
+        vec = Vec2 if self.dim == 2 else Vec3
+        return vec(*self.data.max(axis=0).tolist())
+
+    @property
+    def min_x(self) -> int:
+        return int(self.data[:, 0].min())
+
+    @property
+    def max_x(self) -> int:
+        return int(self.data[:, 0].max())
+
+    @property
+    def min_y(self) -> int:
+        return int(self.data[:, 1].min())
+
+    @property
+    def max_y(self) -> int:
+        return int(self.data[:, 1].max())
+
+    def manhattan_sum(self) -> int:
+        """Sum of manhattan distances over all unordered pairs, O(n log n)"""
+        return sum(_axis_sum(self.data[:, axis]) for axis in range(self.dim))
+
+    def chebyshev_sum(self, chunk_size=1024) -> int:
+        """Sum of chebyshev distances over all unordered pairs"""
+        if self.dim == 2:
+            # max(|dx|, |dy|) == (|du| + |dv|) / 2 with u = x + y and v = x - y
+            x, y = self.data[:, 0], self.data[:, 1]
+            return (_axis_sum(x + y) + _axis_sum(x - y)) // 2
+
+        total = 0
+        for start in range(0, len(self), chunk_size):
+            chunk = self.data[start:start + chunk_size]
+            distances = np.abs(chunk[:, None, :] - self.data[None, :, :]).max(axis=2)
+            total += int(distances.sum())
+        return total // 2
+
+    def pairwise_manhattan(self) -> np.ndarray:
+        """N x N matrix of manhattan distances"""
+        return np.abs(self.data[:, None, :] - self.data[None, :, :]).sum(axis=2)
+
+    def nearest(self, points: "VecArray", metric="manhattan", chunk_size=1024) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        For each of the points, the index and distance of the closest vector in this array.
+
+        :param metric: "manhattan" or "chebyshev"
+        :return: (indices, distances)
+        """
+        if metric not in ("manhattan", "chebyshev"):
+            raise ValueError(f"Unknown metric {metric}")
+
+        indices = np.empty(len(points), dtype=np.int64)
+        distances = np.empty(len(points), dtype=np.int64)
+        for start in range(0, len(points), chunk_size):
+            chunk = points.data[start:start + chunk_size]
+            delta = np.abs(chunk[:, None, :] - self.data[None, :, :])
+            matrix = delta.sum(axis=2) if metric == "manhattan" else delta.max(axis=2)
+            best = matrix.argmin(axis=1)
+            indices[start:start + chunk_size] = best
+            distances[start:start + chunk_size] = matrix[np.arange(len(chunk)), best]
+        return indices, distances
@@ -1,44 +1,42 @@
 import math
-from typing import NamedTuple, Iterable, Tuple
+from typing import NamedTuple, Iterable, Tuple, List
+
+# creates Vec2/Vec3 without going through the generated NamedTuple.__new__
+_new = tuple.__new__
+
+NEIGHBOR_OFFSETS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+"""Offsets of `neigbors`, clockwise"""
+
+NEIGHBOR_OFFSETS_TL_BR = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+"""Offsets of `neigbors_tl_br`, top-left to bottom-right, without center"""
+
+_NEIGHBOR_OFFSETS_TL_BR_CENTER = NEIGHBOR_OFFSETS_TL_BR[:4] + ((0, 0),) + NEIGHBOR_OFFSETS_TL_BR[4:]
+
+MANHATTAN_OFFSETS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+"""Offsets of `manhattan_neighbors`, clockwise"""
 
 
 def neigbors(vec: "Vec2"):
     """Manhattan neighbors inc diagonal, clockwise"""
-    vec = Vec2(*vec)
-    yield vec + (0, 1)
-    yield vec + (1, 1)
-    yield vec + (1, 0)
-    yield vec + (1, -1)
-    yield vec + (0, -1)
-    yield vec + (-1, -1)
-    yield vec + (-1, 0)
-    yield vec + (-1, 1)
+    x, y = vec
+    for dx, dy in NEIGHBOR_OFFSETS:
+        yield _new(Vec2, (x + dx, y + dy))
 
 
 def neigbors_tl_br(vec: "Vec2", include_center=False):
     """Manhattan neighbors inc diagonal, top-left to bottom-right"""
-    vec = Vec2(*vec)
-    yield vec + (-1, -1)
-    yield vec + (0, -1)
-    yield vec + (1, -1)
-    yield vec + (-1, 0)
-
-    if include_center:
-        yield vec
-
-    yield vec + (1, 0)
-    yield vec + (-1, 1)
-    yield vec + (0, 1)
-    yield vec + (1, 1)
+    x, y = vec
+    for dx, dy in _NEIGHBOR_OFFSETS_TL_BR_CENTER if include_center else NEIGHBOR_OFFSETS_TL_BR:
+        yield _new(Vec2, (x + dx, y + dy))
 
 
 def manhattan_neighbors(vec: "Vec2"):
     """Manhattan neighbors, clockwise"""
-    vec = Vec2(*vec)
-    yield vec + (0, 1)
-    yield vec + (1, 0)
-    yield vec + (0, -1)
-    yield vec + (-1, 0)
+    x, y = vec
+    yield _new(Vec2, (x, y + 1))
+    yield _new(Vec2, (x + 1, y))
+    yield _new(Vec2, (x, y - 1))
+    yield _new(Vec2, (x - 1, y))
 
 
 def get_min_x(vecs: Iterable["Vec2"]):
@@ -64,18 +62,22 @@ class Vec2(NamedTuple):
 
     def __add__(self, other):
         x, y = other
-        return Vec2(self.x + x, self.y + y)
+        sx, sy = self
+        return _new(Vec2, (sx + x, sy + y))
 
     def __sub__(self, other):
         x, y = other
-        return Vec2(self.x - x, self.y - y)
+        sx, sy = self
+        return _new(Vec2, (sx - x, sy - y))
 
     def __mul__(self, other):
-        return Vec2(self.x * other, self.y * other)
+        sx, sy = self
+        return _new(Vec2, (sx * other, sy * other))
 
     def __mod__(self, other: Tuple[int, int]):
         mod_x, mod_y = other
-        return Vec2(self.x % mod_x, self.y % mod_y)
+        sx, sy = self
+        return _new(Vec2, (sx % mod_x, sy % mod_y))
 
     def rotate_degree(self, degree):
         """
@@ -116,16 +118,105 @@ class Vec3(NamedTuple):
 
     def __add__(self, other):
         x, y, z = other
-        return Vec3(self.x + x, self.y + y, self.z + z)
+        sx, sy, sz = self
+        return _new(Vec3, (sx + x, sy + y, sz + z))
 
     def __sub__(self, other):
         x, y, z = other
-        return Vec3(self.x - x, self.y - y, self.z - z)
+        sx, sy, sz = self
+        return _new(Vec3, (sx - x, sy - y, sz - z))
 
     def __mul__(self, other):
-        return Vec3(self.x * other, self.y * other, self.z * other)
+        sx, sy, sz = self
+        return _new(Vec3, (sx * other, sy * other, sz * other))
 
     def manhattan(self, other: "Vec3"):
         (x1, y1, z1) = self
         (x2, y2, z2) = other
         return abs(x1 - x2) + abs(y1 - y2) + abs(z1 - z2)
+
+
+class VecGrid:
+    """
+    Interned Vec2 instances and precomputed neighbor tables for a width x height grid starting at (0, 0).
+
+    Every position is created once, neighbor lookups return shared tuples instead of creating new vectors.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._vecs: List[Vec2] = [_new(Vec2, (x, y)) for y in range(height) for x in range(width)]
+        self._manhattan: List[Tuple[Vec2, ...]] = [self._in_bounds(v, MANHATTAN_OFFSETS) for v in self._vecs]
+        self._neighbors: List[Tuple[Vec2, ...]] = []  # built on first use
+
+    def _in_bounds(self, vec: Vec2, offsets) -> Tuple[Vec2, ...]:
+        x, y = vec
+        width, height = self.width, self.height
+        return tuple(
+            self._vecs[(y + dy) * width + x + dx]
+            for dx, dy in offsets
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        )
+
+    def _index(self, x: int, y: int) -> int:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise KeyError((x, y))
+        return y * self.width + x
+
+    def vec(self, x: int, y: int) -> Vec2:
+        """Interned Vec2 for (x, y), KeyError outside the grid"""
+        return self._vecs[self._index(x, y)]
+
+    def __contains__(self, pos) -> bool:
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __iter__(self):
+        return iter(self._vecs)
+
+    def manhattan_neighbors(self, pos) -> Tuple[Vec2, ...]:
+        """Same order as `manhattan_neighbors`, only positions inside the grid, KeyError outside the grid"""
+        return self._manhattan[self._index(*pos)]
+
+    def neigbors(self, pos) -> Tuple[Vec2, ...]:
+        """Same order as `neigbors`, only positions inside the grid, KeyError outside the grid"""
+        index = self._index(*pos)
+        if not self._neighbors:
+            self._neighbors = [self._in_bounds(v, NEIGHBOR_OFFSETS) for v in self._vecs]
+        return self._neighbors[index]
+
+if __name__ == "__main__":
+    from timeit import timeit
+
+    class _GenericVec2(NamedTuple):
+        """Vec2 as implemented before, creating vectors through the generated __new__"""
+        x: int
+        y: int
+
+        def __add__(self, other):
+            x, y = other
+            return _GenericVec2(self.x + x, self.y + y)
+
+    def _generic_manhattan_neighbors(vec):
+        vec = _GenericVec2(*vec)
+        yield vec + (0, 1)
+        yield vec + (1, 0)
+        yield vec + (0, -1)
+        yield vec + (-1, 0)
+
+    size = 100
+    grid = VecGrid(size, size)
+    cells = {Vec2(x, y) for x in range(size) for y in range(size) if (x + y) % 3}
+    generic_cells = {_GenericVec2(x, y) for x, y in cells}
+
+    def bench(name, stmt, number=20):
+        print(f"{name:>32}: {timeit(stmt, number=number):2.4f} sec")
+
+    bench("generic add", lambda: [v + (1, 1) for v in generic_cells])
+    bench("Vec2 add", lambda: [v + (1, 1) for v in cells])
+    bench("generic manhattan_neighbors", lambda: [n for v in generic_cells for n in _generic_manhattan_neighbors(v) if n in generic_cells])
+    bench("manhattan_neighbors", lambda: [n for v in cells for n in manhattan_neighbors(v) if n in cells])
+    bench("VecGrid.manhattan_neighbors", lambda: [n for v in cells for n in grid.manhattan_neighbors(v) if n in cells])
+    bench("Vec2 dict lookups", lambda: [Vec2(x, y) in cells for x in range(size) for y in range(size)])
+    bench("VecGrid interned dict lookups", lambda: [grid.vec(x, y) in cells for x in range(size) for y in range(size)])